@@ -0,0 +1,90 @@
+# Non-blocking dispatcher for gesture actions
+import queue
+import threading
+import time
+
+
+class ActionDispatcher:
+    def __init__(self, actions, max_queue=8, timeout=5.0, debounce=0.5):
+        self.actions = actions  # Looked up when an action runs, so the mapping can change live
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.timeout = timeout  # Seconds to wait for one action before moving on
+        self.debounce = debounce  # Minimum seconds between two runs of the same action
+        self.lock = threading.Lock()
+        self.pending = set()  # Queued but not started yet
+        self.last_submitted = {}
+        self.stats = {"submitted": 0, "coalesced": 0, "debounced": 0, "dropped": 0,
+                      "completed": 0, "failed": 0, "timed_out": 0}
+        self.worker = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.worker.start()
+
+    def stop(self, timeout=2):
+        self.queue.put(None)
+        self.worker.join(timeout)
+
+    # Queue an action without ever blocking the caller; returns True if it was queued
+    def submit(self, name):
+        now = time.time()
+        with self.lock:
+            if name not in self.actions:
+                print(f"❌ No action mapped to '{name}'")
+                return False
+            if name in self.pending:
+                self.stats["coalesced"] += 1
+                return False
+            if now - self.last_submitted.get(name, float("-inf")) < self.debounce:
+                self.stats["debounced"] += 1
+                return False
+            try:
+                self.queue.put_nowait((name, now))
+            except queue.Full:
+                self.stats["dropped"] += 1
+                print(f"⚠️ Action queue full, dropping '{name}'")
+                return False
+            self.pending.add(name)
+            self.last_submitted[name] = now
+            self.stats["submitted"] += 1
+        return True
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            name, submitted_at = item
+            with self.lock:
+                self.pending.discard(name)
+            self._execute(name, submitted_at)
+
+    # Run the action on its own thread so a hung launch can only cost `timeout` seconds
+    def _execute(self, name, submitted_at):
+        action = self.actions.get(name)
+        if action is None:
+            print(f"❌ No action mapped to '{name}'")
+            return
+        outcome = {}
+
+        def call():
+            try:
+                action()
+            except Exception as e:
+                outcome["error"] = e
+
+        started = time.time()
+        runner = threading.Thread(target=call, daemon=True)
+        runner.start()
+        runner.join(self.timeout)
+        elapsed = (time.time() - started) * 1000
+        queued = (started - submitted_at) * 1000
+        with self.lock:
+            if runner.is_alive():
+                self.stats["timed_out"] += 1
+                print(f"⏱️ Action '{name}' still running after {self.timeout}s, moving on")
+            elif "error" in outcome:
+                self.stats["failed"] += 1
+                print(f"❌ Error executing action '{name}': {outcome['error']}")
+            else:
+                self.stats["completed"] += 1
+                print(f"⚡ Action '{name}' done in {elapsed:.0f} ms (queued {queued:.0f} ms)")
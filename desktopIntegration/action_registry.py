@@ -0,0 +1,127 @@
+# Declarative gesture -> action registry backed by gesture_actions.json
+#
+# Each entry maps a gesture name to one action spec:
+#   {"type": "key", "key": "space", "repeat": 1}           pyautogui.press
+#   {"type": "hotkey", "keys": ["alt", "f4"], "repeat": 1}  pyautogui.hotkey
+#   {"type": "app", "path": "C:/.../firefox.exe", "args": []}  subprocess.Popen
+#
+# Specs are compiled into callables once per load; the file is re-read when its
+# mtime changes, so edits take effect without restarting the recognizer.
+import json
+import os
+import subprocess
+import threading
+
+ACTION_TYPES = ("key", "hotkey", "app")
+
+
+# pyautogui is slow to import and needs a display, so only load it when a key action runs
+def _pyautogui():
+    import pyautogui
+    return pyautogui
+
+
+def compile_action(spec):
+    if not isinstance(spec, dict):
+        raise TypeError(f"action spec must be an object, got {type(spec).__name__}")
+    kind = spec.get("type")
+    repeat = int(spec.get("repeat", 1))
+    if kind == "key":
+        key = spec["key"]
+        return lambda: _pyautogui().press(key, presses=repeat)
+    if kind == "hotkey":
+        keys = list(spec["keys"])
+        def hotkey():
+            for _ in range(repeat):
+                _pyautogui().hotkey(*keys)
+        return hotkey
+    if kind == "app":
+        command = [spec["path"], *spec.get("args", [])]
+        return lambda: subprocess.Popen(command)
+    raise ValueError(f"unknown action type '{kind}', expected one of {', '.join(ACTION_TYPES)}")
+
+
+def load_action_specs(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        specs = json.load(f)
+    if not isinstance(specs, dict):
+        raise ValueError(f"expected an object mapping gestures to actions, got {type(specs).__name__}")
+    return specs
+
+
+def compile_actions(specs):
+    actions = {}
+    for name, spec in specs.items():
+        try:
+            actions[name] = compile_action(spec)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"❌ Skipping action '{name}': {e}")
+    return actions
+
+
+# Add one mapping to the registry file; returns False if the gesture already has an action
+def add_action(path, name, spec):
+    compile_action(spec)  # Validate before writing
+    specs = load_action_specs(path)
+    if name in specs:
+        return False
+    specs[name] = spec
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(specs, f, indent=4)
+    os.replace(tmp_path, path)
+    return True
+
+
+class ActionRegistry:
+    def __init__(self, path, poll_interval=1.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.actions = {}
+        self.mtime = None
+        self.stop_event = threading.Event()
+        self.reload()
+
+    def __contains__(self, name):
+        return name in self.actions
+
+    def get(self, name):
+        return self.actions.get(name)
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    # Compile the file into a fresh dict and swap it in with one assignment
+    def reload(self):
+        mtime = self._mtime()
+        try:
+            actions = compile_actions(load_action_specs(self.path))
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not load actions from {self.path}: {e}")
+            self.mtime = mtime
+            return False
+        self.actions = actions
+        self.mtime = mtime
+        print(f"⚡ Loaded {len(actions)} gesture actions from {self.path}")
+        return True
+
+    def _watch(self):
+        while not self.stop_event.wait(self.poll_interval):
+            if self._mtime() != self.mtime:
+                # Whatever the edit broke, keep watching so the next save can fix it
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"❌ Action reload failed: {e!r}")
+                    self.mtime = self._mtime()
+
+    def start(self):
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def stop(self):
+        self.stop_event.set()
@@ -0,0 +1,70 @@
+# Threaded capture pipeline stages
+import threading
+import time
+from collections import deque
+import cv2
+
+
+# Single-slot buffer: writers overwrite, readers always get the newest item
+class LatestSlot:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.item = None
+        self.seq = 0
+
+    def put(self, item):
+        with self.cond:
+            self.item = item
+            self.seq += 1
+            self.cond.notify_all()
+
+    # Wait for an item newer than after_seq; returns (item, seq) or (None, after_seq) on timeout
+    def get(self, after_seq=0, timeout=None):
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.seq > after_seq, timeout):
+                return None, after_seq
+            return self.item, self.seq
+
+
+# Events per second over a sliding window
+class RateCounter:
+    def __init__(self, window=2.0):
+        self.window = window
+        self.times = deque()
+        self.lock = threading.Lock()
+
+    def tick(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            self.times.append(now)
+            while self.times and now - self.times[0] > self.window:
+                self.times.popleft()
+
+    def rate(self):
+        with self.lock:
+            if len(self.times) < 2:
+                return 0.0
+            return (len(self.times) - 1) / (self.times[-1] - self.times[0])
+
+
+# Reads the camera as fast as it delivers frames so nothing queues up in the driver
+class CaptureThread(threading.Thread):
+    def __init__(self, cap, slot, stop_event, size=None):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.slot = slot
+        self.stop_event = stop_event
+        self.size = size
+        self.fps = RateCounter()
+
+    def run(self):
+        while not self.stop_event.is_set() and self.cap.isOpened():
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            captured_at = time.time()
+            if self.size is not None:
+                frame = cv2.resize(frame, self.size)
+            self.slot.put((frame, captured_at))
+            self.fps.tick(captured_at)
+        self.stop_event.set()
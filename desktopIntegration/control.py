@@ -0,0 +1,55 @@
+# Local control channel for the desktop recognizer
+#
+# Line-based text protocol on 127.0.0.1, one reply line per command:
+#   record <start|mid1|mid2|end>   capture the current hand as a keyframe
+#   save <name>                    store the four recorded keyframes as a sign
+#   status                         pipeline rates and matching state
+#   quit                           stop the recognizer
+#
+# Send a command from a shell with:  python control.py record start
+import socket
+import socketserver
+import sys
+import threading
+
+DEFAULT_PORT = 8765
+
+
+class ControlServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, dispatch):
+        self.dispatch = dispatch  # command line -> reply line
+        super().__init__(("127.0.0.1", port), ControlHandler)
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            command = raw.decode("utf-8", "replace").strip()
+            if not command:
+                continue
+            try:
+                reply = self.server.dispatch(command)
+            except Exception as e:
+                reply = f"error {e}"
+            self.wfile.write((reply + "\n").encode())
+
+
+def send_command(command, port=DEFAULT_PORT, timeout=30):
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as conn:
+        conn.sendall((command + "\n").encode())
+        return conn.makefile("r").readline().strip()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python control.py <command> [argument]")
+        sys.exit(2)
+    print(send_command(" ".join(sys.argv[1:])))
@@ -38,7 +38,7 @@ def run_script(script_name):
 
 # Function to add a custom gesture action
 from tkinter import filedialog
-import ast
+from action_registry import add_action
 
 def add_custom_gesture():
     gesture_name = simpledialog.askstring("Custom Gesture", "Enter Gesture Name:")
@@ -54,42 +54,22 @@ def add_custom_gesture():
         key = simpledialog.askstring("Key Mapping", "Enter the keyboard key to map:")
         if not key:
             return
-        action_code = f"lambda: pyautogui.press('{key}')"
+        spec = {"type": "key", "key": key}
     else:
         app_path = filedialog.askopenfilename(title="Select Application", filetypes=[("Executable Files", "*.exe;*.bat;*.cmd"), ("All Files", "*.*")])
         if not app_path:
             return
-        action_code = f"lambda: subprocess.Popen(r'{app_path}')"
+        spec = {"type": "app", "path": app_path}
 
-    # Path to gesture_actions.py
-    file_path = "gesture_actions.py"
-
-    # Read existing content
-    if os.path.exists(file_path):
-        with open(file_path, "r") as file:
-            lines = file.readlines()
-    else:
-        lines = ["import pyautogui\n", "import subprocess\n", "\n", "GESTURE_ACTIONS = {\n"]
-
-    # Check if the gesture already exists
-    for line in lines:
-        if f'"{gesture_name}":' in line:
-            messagebox.showerror("Error", f"Gesture '{gesture_name}' already exists.")
-            return
-
-    # Insert new gesture before the closing bracket
-    for i in range(len(lines) - 1, -1, -1):
-        if lines[i].strip() == "}":
-            lines.insert(i, f'    "{gesture_name}": {action_code},\n')
-            break
-    else:
-        # If "}" is not found, assume the dictionary is empty or malformed
-        lines.append(f'    "{gesture_name}": {action_code},\n')
-        lines.append("}\n")
-
-    # Write back updated content
-    with open(file_path, "w") as file:
-        file.writelines(lines)
+    # Mappings are plain data in gesture_actions.json; a running recognizer picks them up live
+    try:
+        added = add_action("gesture_actions.json", gesture_name, spec)
+    except ValueError as e:
+        messagebox.showerror("Error", f"gesture_actions.json is invalid: {e}")
+        return
+    if not added:
+        messagebox.showerror("Error", f"Gesture '{gesture_name}' already exists.")
+        return
 
     messagebox.showinfo("Success", f"Gesture '{gesture_name}' saved successfully!")
 
@@ -2,13 +2,14 @@
 import mediapipe as mp
 import cv2
 import numpy as np
+import argparse
 import json
 import os
+import signal
 from fastdtw import fastdtw
 from scipy.spatial.distance import euclidean
 import time
-import pyautogui
-import subprocess
+import threading
 import time
 import mediapipe as mp
 import cv2
@@ -16,42 +17,59 @@ import numpy as np
 from fastdtw import fastdtw
 from scipy.spatial.distance import euclidean
 
-from gesture_actions import GESTURE_ACTIONS
+from action_dispatcher import ActionDispatcher
+from capture import CaptureThread, LatestSlot, RateCounter
+from control import DEFAULT_PORT, ControlServer
+from action_registry import ActionRegistry
+from gesture_store import load_gesture_store
+from motion import MotionGate
+from recording import SessionWriter
+from roi import HandROI, crop_frame, to_frame_coords
 
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 
-TARGET_WIDTH = 320
-TARGET_HEIGHT = 240
+TARGET_WIDTH = int(os.getenv("GESTURA_FRAME_WIDTH", "320"))  # Larger frames pay off with the hand ROI enabled
+TARGET_HEIGHT = int(os.getenv("GESTURA_FRAME_HEIGHT", "240"))
+STATS_INTERVAL = 5  # Seconds between pipeline stats lines
+FRAME_SEQUENCE = ["start", "mid1", "mid2", "end"]
+
+parser = argparse.ArgumentParser(description="Control the desktop with recorded hand gestures.")
+parser.add_argument("--headless", action="store_true",
+                    default=os.getenv("GESTURA_SHOW_WINDOW", "1") != "1",
+                    help="run without a window or landmark drawing, driven by the control socket")
+parser.add_argument("--control-port", type=int, default=None,
+                    help=f"local control socket port (default {DEFAULT_PORT} when headless, 0 disables)")
+parser.add_argument("--record", metavar="PATH", default=None,
+                    help="record the detected landmarks to PATH for replay with signpred/bench.py")
+args = parser.parse_args()
+SHOW_WINDOW = not args.headless
+CONTROL_PORT = args.control_port if args.control_port is not None else (DEFAULT_PORT if args.headless else 0)
 cap = cv2.VideoCapture(2)
 hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
 
 # File to store gestures
 GESTURE_FILE = "gestures.json"
+ACTION_FILE = "gesture_actions.json"  # Gesture -> action mappings, reloaded when edited
 COOLDOWN_TIME = 1  # Cooldown time before detecting the next gesture
+ACTION_QUEUE_SIZE = 8  # Actions waiting to run before new ones are dropped
+ACTION_TIMEOUT = 5  # Seconds to wait on one action before moving on
+ACTION_DEBOUNCE = 0.5  # Minimum seconds between two runs of the same action
+MOTION_GATE = os.getenv("GESTURA_MOTION_GATE", "1") == "1"  # Skip MediaPipe while nothing in view moves
+MOTION_REFRESH_INTERVAL = 1.0  # Seconds before a static scene is re-inferred anyway
+HAND_ROI = os.getenv("GESTURA_HAND_ROI", "0") == "1"  # Run MediaPipe on a crop around the last seen hand
 
 # Define key landmarks to check
 keypoints_to_check = [0, 1, 4, 5, 8, 9, 12, 13, 16, 17, 20]
  
 
-# Load existing gestures if available
-if os.path.exists(GESTURE_FILE):
-    with open(GESTURE_FILE, "r") as f:
-        gesture_dict = json.load(f)
-        # Convert each stored frame into a numpy array
-        gesture_dict = {
-            k: {
-                "start": np.array(v["start"], dtype=np.float32),
-                "mid1": np.array(v["mid1"], dtype=np.float32),
-                "mid2": np.array(v["mid2"], dtype=np.float32),
-                "end": np.array(v["end"], dtype=np.float32)
-            }
-            for k, v in gesture_dict.items()
-        }
-else:
-    gesture_dict = {}
-
-# Variables to track sequential matching
+# Load existing gestures if available (views into the compiled gesture cache).
+# Never mutated in place: saves build a new dict and swap it in, so the
+# inference thread can iterate whichever version it picked up.
+gesture_dict = load_gesture_store(GESTURE_FILE).as_dict()
+save_lock = threading.Lock()  # Saves come from the display and control threads
+
+# Variables to track sequential matching (only touched by the inference thread)
 pending_gesture = None  # The gesture name matched at "start"
 frame_stage = 0         # 0: start, 1: mid1, 2: mid2, 3: end
 last_detection_time = 0
@@ -61,6 +79,19 @@ gesture_keyframes={}
 STAGE_TIMEOUT = 5
 stage_start_time = None  # Record when the current stage started
 
+# Pipeline stages hand frames over through single-slot buffers, so each stage
+# always works on the freshest frame and stale ones are simply overwritten
+stop_event = threading.Event()
+capture_slot = LatestSlot()  # (frame, captured_at) from the capture thread
+result_slot = LatestSlot()   # (frame, results, captured_at) from the inference thread
+inference_fps = RateCounter()
+action_registry = ActionRegistry(ACTION_FILE)
+dispatcher = ActionDispatcher(action_registry, ACTION_QUEUE_SIZE, ACTION_TIMEOUT, ACTION_DEBOUNCE)
+frame_ages = []  # Capture-to-result latency since the last stats line
+motion_gate = MotionGate(refresh_interval=MOTION_REFRESH_INTERVAL) if MOTION_GATE else None
+hand_roi = HandROI() if HAND_ROI else None
+recorder = SessionWriter(args.record) if args.record else None  # Only touched by the inference thread
+
 def normalize_landmarks(landmarks):
     """Normalize landmarks by centering and scaling relative to the entire hand size."""
     min_x, min_y, _ = np.min(landmarks, axis=0)
@@ -74,23 +105,36 @@ def normalize_landmarks(landmarks):
         centered_landmarks /= scale
     return centered_landmarks
 
-while cap.isOpened():
-    ret, frame = cap.read()
-    if not ret:
-        break
+def hand_landmarks_array(hand_landmarks):
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+def remap_results(results, box, shape):
+    """Rewrite landmarks found in an ROI crop into full-frame coordinates, in place."""
+    if box is None:
+        return
+    for hand_landmarks in results.multi_hand_landmarks or []:
+        mapped = to_frame_coords(hand_landmarks_array(hand_landmarks), box, shape)
+        for lm, (x, y, z) in zip(hand_landmarks.landmark, mapped):
+            lm.x, lm.y, lm.z = float(x), float(y), float(z)
 
-    frame = cv2.resize(frame, (TARGET_WIDTH, TARGET_HEIGHT))
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+def detect_hands(frame):
+    """Run MediaPipe on the frame, or only on the hand's region when the ROI is enabled."""
+    box = hand_roi.region() if hand_roi is not None else None
+    rgb_frame = cv2.cvtColor(crop_frame(frame, box), cv2.COLOR_BGR2RGB)
     results = hands.process(rgb_frame)
-    current_time = time.time()
+    if hand_roi is not None:
+        remap_results(results, box, frame.shape)
+        hand_roi.update([hand_landmarks_array(h) for h in results.multi_hand_landmarks or []], frame.shape)
+    return results
+
+def recognize(results, current_time):
+    """Advance the keyframe state machine with one frame's detections."""
+    global pending_gesture, frame_stage, last_detection_time, stage_start_time
+    gestures = gesture_dict  # One consistent version for this frame
 
     # Optional cooldown: skip processing if too soon after last detection
     if current_time - last_detection_time < COOLDOWN_TIME:
-        cv2.imshow("Sign Prediction", frame)
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q') or key == 27:
-            break
-        continue
+        return
 
     # If we're in a sequence (frame_stage > 0) but too much time has passed, reset sequence.
     if frame_stage > 0 and stage_start_time is not None:
@@ -102,19 +146,17 @@ while cap.isOpened():
 
     if results.multi_hand_landmarks:
         for hand_landmarks in results.multi_hand_landmarks:
-            mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-            landmarks = np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark],
-                                 dtype=np.float32)
+            landmarks = hand_landmarks_array(hand_landmarks)
             if landmarks.shape[0] < max(keypoints_to_check):
                 continue  # Incomplete detection; skip this frame
 
             normalized_landmarks = normalize_landmarks(landmarks)
             normalized_keypoints = normalized_landmarks[keypoints_to_check]
-            frame_sequence = ["start", "mid1", "mid2", "end"]
+            frame_sequence = FRAME_SEQUENCE
 
             # For the first stage, if no sequence is started, try to match "start"
             if frame_stage == 0:
-                for gesture_name, frames in gesture_dict.items():
+                for gesture_name, frames in gestures.items():
                     keyframe_points = frames["start"].reshape(-1, 3)
                     if keyframe_points.shape != normalized_keypoints.shape:
                         continue
@@ -129,7 +171,7 @@ while cap.isOpened():
             # For subsequent stages, use the pending gesture's corresponding frame
             elif pending_gesture:
                 stage_name = frame_sequence[frame_stage]
-                keyframe_points = gesture_dict[pending_gesture][stage_name].reshape(-1, 3)
+                keyframe_points = gestures[pending_gesture][stage_name].reshape(-1, 3)
                 if keyframe_points.shape == normalized_keypoints.shape:
                     distance, _ = fastdtw(keyframe_points, normalized_keypoints, dist=euclidean)
                     if distance < 1:
@@ -138,46 +180,163 @@ while cap.isOpened():
                         stage_start_time = current_time  # Reset timer for next stage
                         if frame_stage == 3:  # All stages matched
                             print(f"✅ Detected Sign: {pending_gesture}")
-                            try:
-                                GESTURE_ACTIONS[pending_gesture]()
-                            except Exception as e:
-                                print(f"❌ Error executing action: {e}")
+                            dispatcher.submit(pending_gesture)
                             last_detection_time = current_time
                             pending_gesture = None
                             frame_stage = 0  # Reset for next gesture detection
                             stage_start_time = None
                             break  # Stop processing further for this hand
 
-    # Handle key presses to record frames or quit
-    key = cv2.waitKey(1) & 0xFF
-    if key == ord('1'):
-        if results.multi_hand_landmarks:
-            gesture_keyframes["start"] = normalize_landmarks(landmarks)[keypoints_to_check].copy()
-            print("✅ Start frame recorded!")
-    elif key == ord('2'):
-        if results.multi_hand_landmarks:
-            gesture_keyframes["mid1"] = normalize_landmarks(landmarks)[keypoints_to_check].copy()
-            print("✅ Mid1 frame recorded!")
-    elif key == ord('3'):
-        if results.multi_hand_landmarks:
-            gesture_keyframes["mid2"] = normalize_landmarks(landmarks)[keypoints_to_check].copy()
-            print("✅ Mid2 frame recorded!")
-    elif key == ord('4'):
-        if results.multi_hand_landmarks:
-            gesture_keyframes["end"] = normalize_landmarks(landmarks)[keypoints_to_check].copy()
-            print("✅ End frame recorded!")
-            gesture_name = input("Enter the word for this sign: ")
-            gesture_dict[gesture_name] = gesture_keyframes.copy()
-            with open(GESTURE_FILE, "w") as f:
-                json.dump(
-                    {k: {frame: v.tolist() for frame, v in frames.items()} for k, frames in gesture_dict.items()},
-                    f
-                )
-            print(f"📁 Sign '{gesture_name}' saved permanently!")
-    elif key == ord('q') or key == 27:
-        break
-
-    cv2.imshow("Sign Prediction", frame)
+def inference_loop(capture):
+    """Pull the freshest captured frame, run MediaPipe and recognition, publish the result."""
+    seq = 0
+    results = None
+    last_report = time.time()
+    while not stop_event.is_set():
+        item, seq = capture_slot.get(seq, timeout=0.5)
+        if item is None:
+            continue
+        frame, captured_at = item
+        # Static frames reuse the previous landmarks instead of running the hand graph
+        if results is None or motion_gate is None or motion_gate.check(frame, captured_at):
+            results = detect_hands(frame)
+        current_time = time.time()
+        recognize(results, current_time)
+        if recorder is not None:
+            recorder.write_landmarks([hand_landmarks_array(h) for h in results.multi_hand_landmarks or []], current_time)
+        result_slot.put((frame, results, captured_at))
+
+        inference_fps.tick(current_time)
+        frame_ages.append(current_time - captured_at)
+        if current_time - last_report >= STATS_INTERVAL:
+            mean_age = sum(frame_ages) / len(frame_ages)
+            print(f"📊 capture {capture.fps.rate():.1f} fps, inference {inference_fps.rate():.1f} fps, frame age {mean_age * 1000:.0f} ms{motion_summary()}")
+            frame_ages.clear()
+            last_report = current_time
+
+def motion_summary():
+    summary = ""
+    if motion_gate is not None:
+        summary += f", motion skip {motion_gate.skip_rate() * 100:.0f}% of {motion_gate.counters['frames']}"
+    if hand_roi is not None:
+        summary += f", roi crops {hand_roi.report()['crop_rate'] * 100:.0f}%"
+    return summary
+
+def save_keyframe(stage, results):
+    if results is None or not results.multi_hand_landmarks:
+        return False
+    landmarks = hand_landmarks_array(results.multi_hand_landmarks[-1])
+    gesture_keyframes[stage] = normalize_landmarks(landmarks)[keypoints_to_check].copy()
+    print(f"✅ {stage.capitalize()} frame recorded!")
+    return True
+
+def save_gesture(gesture_name):
+    global gesture_dict
+    missing = [stage for stage in FRAME_SEQUENCE if stage not in gesture_keyframes]
+    if missing:
+        return False, f"missing keyframes {' '.join(missing)}"
+    with save_lock:
+        updated = {**gesture_dict, gesture_name: gesture_keyframes.copy()}
+        with open(GESTURE_FILE, "w") as f:
+            json.dump(
+                {k: {frame: v.tolist() for frame, v in frames.items()} for k, frames in updated.items()},
+                f
+            )
+        gesture_dict = updated
+    print(f"📁 Sign '{gesture_name}' saved permanently!")
+    return True, "saved"
+
+def run_command(command):
+    """Execute one control command (see control.py) and return a one-line reply."""
+    action, _, arg = command.strip().partition(" ")
+    action, arg = action.lower(), arg.strip()
+    if action == "record":
+        if arg not in FRAME_SEQUENCE:
+            return f"error stage must be one of {', '.join(FRAME_SEQUENCE)}"
+        item, _ = result_slot.get(0, timeout=0)
+        return "ok" if save_keyframe(arg, item[1] if item else None) else "error no hand in view"
+    if action == "save":
+        if not arg:
+            return "error save needs a gesture name"
+        saved, message = save_gesture(arg)
+        return f"ok {message}" if saved else f"error {message}"
+    if action == "status":
+        return (
+            f"ok capture {capture.fps.rate():.1f} fps, inference {inference_fps.rate():.1f} fps{motion_summary()}, "
+            f"stage {frame_stage}, pending {pending_gesture}, recorded {' '.join(gesture_keyframes) or 'none'}, "
+            f"actions {' '.join(f'{k}={v}' for k, v in dispatcher.stats.items())}"
+        )
+    if action == "quit":
+        stop_event.set()
+        return "ok"
+    return f"error unknown command '{action}'"
+
+# Window keys are shortcuts for control commands
+KEY_COMMANDS = {
+    ord('1'): "record start",
+    ord('2'): "record mid1",
+    ord('3'): "record mid2",
+    ord('4'): "record end",
+    ord('q'): "quit",
+    27: "quit",
+}
+
+def handle_key(key):
+    command = KEY_COMMANDS.get(key)
+    if command is None:
+        return
+    reply = run_command(command)
+    if command == "record end" and reply == "ok":
+        gesture_name = input("Enter the word for this sign: ")
+        print(run_command(f"save {gesture_name}"))
+    elif reply != "ok":
+        print(reply)
+
+def display_loop():
+    """Draw and show the latest result on the main thread, which also owns the keyboard."""
+    seq = 0
+    while not stop_event.is_set():
+        item, seq = result_slot.get(seq, timeout=0.05)
+        if item is not None:
+            frame, results, _ = item
+            if results.multi_hand_landmarks:
+                for hand_landmarks in results.multi_hand_landmarks:
+                    mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+            cv2.imshow("Sign Prediction", frame)
+        handle_key(cv2.waitKey(1) & 0xFF)
+
+capture = CaptureThread(cap, capture_slot, stop_event, (TARGET_WIDTH, TARGET_HEIGHT))
+inference = threading.Thread(target=inference_loop, args=(capture,), daemon=True)
+dispatcher.start()
+action_registry.start()
+capture.start()
+inference.start()
+control = None
+if CONTROL_PORT:
+    control = ControlServer(CONTROL_PORT, run_command)
+    control.start()
+    print(f"🎛️ Control socket listening on 127.0.0.1:{CONTROL_PORT}")
+signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+try:
+    if SHOW_WINDOW:
+        display_loop()
+    else:
+        # Poll so Ctrl+C is delivered on every platform
+        while not stop_event.wait(0.5):
+            pass
+except KeyboardInterrupt:
+    pass
+finally:
+    stop_event.set()
+    if control is not None:
+        control.shutdown()
+    inference.join(timeout=2)
+    capture.join(timeout=2)
+    action_registry.stop()
+    dispatcher.stop()
+    if recorder is not None:
+        recorder.close()
+        print(f"📼 Recorded {recorder.frames} frames to {recorder.path}")
 
 cap.release()
 cv2.destroyAllWindows()
@@ -0,0 +1,40 @@
+# Cheap change detector that lets static frames skip hand inference
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self, pixel_threshold=12, min_changed=0.005, refresh_interval=1.0, size=(32, 24)):
+        self.pixel_threshold = pixel_threshold  # Grey levels a thumbnail pixel must move to count as changed
+        self.min_changed = min_changed  # Fraction of changed pixels that counts as motion
+        self.refresh_interval = refresh_interval  # Seconds before inference is forced on a static scene
+        self.size = size
+        self.reference = None  # Thumbnail of the last frame that went through inference
+        self.last_inference = float("-inf")
+        self.counters = {"frames": 0, "inferred": 0, "skipped": 0, "forced": 0}
+
+    def thumbnail(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    # Decide whether this frame needs inference; False means reuse the previous landmarks
+    def check(self, frame, now):
+        self.counters["frames"] += 1
+        thumb = self.thumbnail(frame)
+        if self.reference is not None and self.reference.shape == thumb.shape:
+            changed = np.count_nonzero(cv2.absdiff(thumb, self.reference) > self.pixel_threshold)
+            if changed < self.min_changed * thumb.size:
+                if now - self.last_inference < self.refresh_interval:
+                    self.counters["skipped"] += 1
+                    return False
+                self.counters["forced"] += 1
+        self.reference = thumb
+        self.last_inference = now
+        self.counters["inferred"] += 1
+        return True
+
+    def skip_rate(self):
+        return self.counters["skipped"] / self.counters["frames"] if self.counters["frames"] else 0.0
+
+    def report(self):
+        return {**self.counters, "skip_rate": self.skip_rate()}
@@ -0,0 +1,80 @@
+# Hand region-of-interest cropping between consecutive frames
+#
+# After a frame with hands, the next one is cropped to a square around their
+# landmark bounding box (plus margin), so MediaPipe only sees that region.
+# Landmarks found in the crop are mapped back to full-frame coordinates.
+# When the hand is lost, or every full_every frames so new hands can appear,
+# the full frame is used instead.
+import numpy as np
+
+
+# Crop a frame to box = (x0, y0, x1, y1) in pixels; None keeps the full frame
+def crop_frame(img, box):
+    if box is None:
+        return img
+    x0, y0, x1, y1 = box
+    return img[y0:y1, x0:x1]
+
+
+# Map (N, 3) landmarks normalised to the crop back to the full frame's normalisation
+def to_frame_coords(points, box, shape):
+    if box is None:
+        return points
+    height, width = shape[:2]
+    x0, y0, x1, y1 = box
+    mapped = np.empty_like(points)
+    mapped[:, 0] = (points[:, 0] * (x1 - x0) + x0) / width
+    mapped[:, 1] = (points[:, 1] * (y1 - y0) + y0) / height
+    mapped[:, 2] = points[:, 2] * (x1 - x0) / width  # z shares the x scale
+    return mapped
+
+
+class HandROI:
+    def __init__(self, margin=0.3, min_size=96, max_fraction=0.6, full_every=30):
+        self.margin = margin  # Padding on each side, as a fraction of the hand box
+        self.min_size = min_size  # Smallest crop side in pixels
+        self.max_fraction = max_fraction  # Crops larger than this share of the frame area use the full frame
+        self.full_every = full_every  # Force a full frame this often so other hands can be found
+        self.box = None
+        self.since_full = 0
+        self.counters = {"frames": 0, "cropped": 0, "full": 0, "lost": 0}
+
+    # Box to use for the next frame, or None for the full frame
+    def region(self):
+        self.counters["frames"] += 1
+        if self.box is None or self.since_full >= self.full_every:
+            self.since_full = 0
+            self.counters["full"] += 1
+            return None
+        self.since_full += 1
+        self.counters["cropped"] += 1
+        return self.box
+
+    # Recompute the crop from full-frame landmarks of the frame just processed
+    def update(self, detected, shape):
+        if not detected:
+            if self.box is not None:
+                self.counters["lost"] += 1
+            self.box = None
+            return
+        height, width = shape[:2]
+        points = np.concatenate(detected)
+        min_x, min_y = points[:, 0].min() * width, points[:, 1].min() * height
+        max_x, max_y = points[:, 0].max() * width, points[:, 1].max() * height
+        side = max(max_x - min_x, max_y - min_y) * (1 + 2 * self.margin)
+        side = int(min(max(side, self.min_size), width, height))
+        if side * side > self.max_fraction * width * height:
+            self.box = None
+            return
+        # Centre on the hands, then slide the square back inside the frame
+        x0 = int(np.clip((min_x + max_x - side) / 2, 0, width - side))
+        y0 = int(np.clip((min_y + max_y - side) / 2, 0, height - side))
+        self.box = (x0, y0, x0 + side, y0 + side)
+
+    def reset(self):
+        self.box = None
+        self.since_full = 0
+
+    def report(self):
+        frames = self.counters["frames"]
+        return {**self.counters, "crop_rate": self.counters["cropped"] / frames if frames else 0.0}
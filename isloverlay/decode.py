@@ -0,0 +1,64 @@
+# Frame decoding at the smallest JPEG scale that still covers the inference size
+import struct
+import time
+import cv2
+import numpy as np
+
+REDUCED_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+# Start-of-frame markers carry the image size; DHT (C4), JPG (C8) and DAC (CC) share the range but don't
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+# Read (width, height) from a JPEG header without decoding; None if not a JPEG
+def jpeg_size(data):
+    if data[:2] != b"\xff\xd8":
+        return None
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # Markers without a length
+            pos += 2
+            continue
+        (length,) = struct.unpack_from(">H", data, pos + 2)
+        if marker in SOF_MARKERS:
+            if pos + 9 > len(data):
+                return None
+            height, width = struct.unpack_from(">HH", data, pos + 5)
+            return width, height
+        if marker == 0xDA:  # Entropy-coded data starts; no frame header seen
+            return None
+        pos += 2 + length
+    return None
+
+
+# libjpeg can decode at 1/2, 1/4 or 1/8 scale; pick the largest reduction still >= target
+def decode_flag(size, target):
+    if size is None or not target or not all(target):
+        return cv2.IMREAD_COLOR, 1
+    width, height = size
+    target_width, target_height = target
+    for factor, flag in REDUCED_FLAGS:
+        if width // factor >= target_width and height // factor >= target_height:
+            return flag, factor
+    return cv2.IMREAD_COLOR, 1
+
+
+# Decode a frame, reduced towards target=(width, height) if possible. With rgb=True the
+# channels are swapped in the decoded buffer itself rather than into a new array.
+# timing, if given, receives the seconds spent decoding and converting
+def decode_frame(data, target=None, rgb=False, timing=None):
+    started = time.perf_counter()
+    flag, _ = decode_flag(jpeg_size(data), target)
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    decoded = time.perf_counter()
+    if img is not None and rgb:
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+    if timing is not None:
+        timing["decode"] = decoded - started
+        timing["color"] = time.perf_counter() - decoded
+    return img
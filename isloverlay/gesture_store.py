@@ -0,0 +1,149 @@
+# Compiled binary gesture store cached next to gestures.json
+#
+# gestures.json is compiled once into <name>.cache.npy, a single
+# (stages, gestures, points, 3) float32 tensor, plus <name>.cache.json holding
+# the name index and the source file's mtime, size and sha256. The cache is
+# reused while the JSON is unchanged and is memory-mapped, so every process
+# serving the same directory shares one copy of the templates.
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+
+FRAME_SEQUENCE = ["start", "mid1", "mid2", "end"]
+CACHE_VERSION = 1
+logger = logging.getLogger("gestura")
+
+
+# Recordings of one sign are stored as word, word_2, word_3, ...
+def variant_word(name):
+    return name.split("_")[0]
+
+
+class GestureStore:
+    def __init__(self, names, templates):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.templates = templates
+
+        # Group variants by word and keep a per-stage centroid for each word
+        self.words = list(dict.fromkeys(variant_word(name) for name in names))
+        word_index = {word: i for i, word in enumerate(self.words)}
+        self.word_of = np.array([word_index[variant_word(name)] for name in names], dtype=np.intp)
+        self.variants = [np.flatnonzero(self.word_of == w) for w in range(len(self.words))]
+        membership = np.zeros((len(self.words), len(names)), dtype=np.float32)
+        membership[self.word_of, np.arange(len(names))] = 1
+        membership /= np.maximum(membership.sum(axis=1, keepdims=True), 1)
+        self.centroids = np.einsum("wg,sgpc->swpc", membership, templates)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    @property
+    def point_shape(self):
+        return self.templates.shape[2:] if self.names else None
+
+    # Zero-copy view of one keyframe
+    def get(self, name, stage):
+        return self.templates[FRAME_SEQUENCE.index(stage), self.index[name]]
+
+    # {name: {stage: view}} in the layout the old loaders produced
+    def as_dict(self):
+        return {
+            name: {stage: self.templates[s, i] for s, stage in enumerate(FRAME_SEQUENCE)}
+            for i, name in enumerate(self.names)
+        }
+
+
+# Stack raw {name: {stage: points}} data into one contiguous tensor.
+# Templates whose stages don't share the first template's shape are skipped.
+def compile_templates(gesture_dict):
+    names, stacks, point_shape = [], [], None
+    for name, frames in gesture_dict.items():
+        stages = [np.asarray(frames[s], dtype=np.float32).reshape(-1, 3) for s in FRAME_SEQUENCE]
+        if point_shape is None:
+            point_shape = stages[0].shape
+        if any(stage.shape != point_shape for stage in stages):
+            logger.warning("normalize check failed for '%s', skipping template", name)
+            continue
+        names.append(name)
+        stacks.append(stages)
+    if not stacks:
+        return [], np.zeros((len(FRAME_SEQUENCE), 0, 0, 3), dtype=np.float32)
+    return names, np.ascontiguousarray(np.stack(stacks, axis=1), dtype=np.float32)
+
+
+def cache_paths(json_path):
+    base = os.path.splitext(json_path)[0]
+    return base + ".cache.npy", base + ".cache.json"
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# Write to a temporary file and rename so readers never see a partial cache
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+# Return the cached index if it still describes json_path, refreshing its mtime on a hash hit
+def _valid_cache_index(json_path, data_path, index_path, stat):
+    if not (os.path.exists(data_path) and os.path.exists(index_path)):
+        return None
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != CACHE_VERSION or index.get("source_size") != stat.st_size:
+        return None
+    if index.get("source_mtime_ns") == stat.st_mtime_ns:
+        return index
+    if index.get("source_sha256") == file_digest(json_path):
+        index["source_mtime_ns"] = stat.st_mtime_ns
+        try:
+            _write_atomic(index_path, lambda f: f.write(json.dumps(index).encode()))
+        except OSError:
+            pass
+        return index
+    return None
+
+
+def load_gesture_store(json_path):
+    if not os.path.exists(json_path):
+        return GestureStore(*compile_templates({}))
+
+    data_path, index_path = cache_paths(json_path)
+    stat = os.stat(json_path)
+    index = _valid_cache_index(json_path, data_path, index_path, stat)
+    if index is not None and index["names"]:
+        return GestureStore(index["names"], np.load(data_path, mmap_mode="r").view(np.ndarray))
+
+    with open(json_path, "r") as f:
+        names, templates = compile_templates(json.load(f))
+    if not names:
+        return GestureStore(names, templates)
+    index = {
+        "version": CACHE_VERSION,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+        "source_sha256": file_digest(json_path),
+        "names": names,
+    }
+    try:
+        _write_atomic(data_path, lambda f: np.save(f, templates))
+        _write_atomic(index_path, lambda f: f.write(json.dumps(index).encode()))
+    except OSError as e:
+        logger.warning("Could not write gesture cache: %s", e)
+        return GestureStore(names, templates)
+    logger.info("Compiled %d gestures from %s", len(names), json_path)
+    return GestureStore(names, np.load(data_path, mmap_mode="r").view(np.ndarray))
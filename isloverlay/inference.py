@@ -0,0 +1,159 @@
+# Off-loop MediaPipe Hands inference
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import cv2
+import numpy as np
+import mediapipe as mp
+from roi import crop_frame, to_frame_coords
+
+# One Hands graph per worker thread/process, created on first use
+_worker = threading.local()
+
+# Initialize Mediapipe
+def initialize_mediapipe(max_num_hands=2):
+    return mp.solutions.hands.Hands(
+        max_num_hands=max_num_hands, min_detection_confidence=0.7, min_tracking_confidence=0.7
+    )
+
+# Runs inside the pool: BGR frame in, list of (21, 3) landmark arrays out.
+# Uses the caller's leased Hands graph if given, else the worker's own.
+# With a box only that region is processed; landmarks stay full-frame relative.
+# rgb=True means the frame was already converted at decode time.
+# Returns the landmarks and perf_counter stamps (start, converted, processed, done).
+def detect_landmarks(img, hands=None, box=None, rgb=False):
+    started = time.perf_counter()
+    if hands is None:
+        hands = getattr(_worker, "hands", None)
+        if hands is None:
+            hands = _worker.hands = initialize_mediapipe()
+    rgb_frame = crop_frame(img, box)
+    if not rgb:
+        rgb_frame = cv2.cvtColor(rgb_frame, cv2.COLOR_BGR2RGB)
+    converted = time.perf_counter()
+    results = hands.process(rgb_frame)
+    processed = time.perf_counter()
+    detected = [
+        to_frame_coords(
+            np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32), box, img.shape
+        )
+        for hand_landmarks in results.multi_hand_landmarks or []
+    ]
+    return detected, (started, converted, processed, time.perf_counter())
+
+
+class InferenceExecutor:
+    def __init__(self, workers=2, queue_depth=4, mode="thread"):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown inference mode '{mode}'.")
+        pool_class = ThreadPoolExecutor if mode == "thread" else ProcessPoolExecutor
+        self.pool = pool_class(max_workers=workers)
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.mode = mode
+        self.pending = 0  # Only touched from the event loop thread
+        self.stats = {"frames": 0, "dropped": 0, "wait_total": 0.0, "compute_total": 0.0}
+
+    # Submit a frame and await its landmarks; returns None if the queue is full
+    async def run(self, img, tracker=None, box=None, rgb=False):
+        if tracker is not None and self.mode != "thread":
+            raise ValueError("Leased trackers can only be used with the thread pool.")
+        if self.pending >= self.workers + self.queue_depth:
+            self.stats["dropped"] += 1
+            return None
+        self.pending += 1
+        submitted = time.perf_counter()
+        try:
+            detected, (started, converted, processed, finished) = await asyncio.get_running_loop().run_in_executor(
+                self.pool, detect_landmarks, img, tracker.hands if tracker else None, box, rgb
+            )
+        finally:
+            self.pending -= 1
+        if tracker is not None:
+            tracker.tracked_hands = len(detected)
+        timing = {
+            "wait": started - submitted,
+            "compute": finished - started,
+            "prepare": converted - started,  # Crop, plus colour conversion unless done at decode
+            "hands": processed - converted,
+            "landmarks": finished - processed,
+        }
+        self.stats["frames"] += 1
+        self.stats["wait_total"] += timing["wait"]
+        self.stats["compute_total"] += timing["compute"]
+        return detected, timing
+
+    def report(self):
+        frames = self.stats["frames"]
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "pending": self.pending,
+            "frames": frames,
+            "dropped": self.stats["dropped"],
+            "avg_wait_ms": 1000 * self.stats["wait_total"] / frames if frames else 0.0,
+            "avg_compute_ms": 1000 * self.stats["compute_total"] / frames if frames else 0.0,
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# A Hands graph leased to a single connection so its tracking state stays coherent
+class Tracker:
+    def __init__(self, max_num_hands=1):
+        self.hands = initialize_mediapipe(max_num_hands)
+        self.max_num_hands = max_num_hands
+        self.tracked_hands = 0
+
+    # The graph only reruns palm detection while fewer than max_num_hands are tracked
+    @property
+    def tracking(self):
+        return self.tracked_hands >= self.max_num_hands
+
+    def reset(self):
+        self.hands.reset()
+        self.tracked_hands = 0
+
+
+class TrackerPool:
+    def __init__(self, max_size=8, warm=2, max_num_hands=1):
+        self.max_size = max_size
+        self.max_num_hands = max_num_hands
+        self.idle = [Tracker(max_num_hands) for _ in range(min(warm, max_size))]
+        self.created = len(self.idle)
+        self.leased = 0
+
+    # Lease a tracker, building a new one off the event loop if no spare is idle.
+    # Returns None once max_size trackers are leased.
+    async def acquire(self):
+        if self.idle:
+            tracker = self.idle.pop()
+        elif self.created < self.max_size:
+            self.created += 1
+            try:
+                tracker = await asyncio.get_running_loop().run_in_executor(
+                    None, Tracker, self.max_num_hands
+                )
+            except Exception:
+                self.created -= 1
+                raise
+        else:
+            return None
+        self.leased += 1
+        return tracker
+
+    def release(self, tracker):
+        self.leased -= 1
+        tracker.reset()
+        self.idle.append(tracker)
+
+    def report(self):
+        return {
+            "max_size": self.max_size,
+            "created": self.created,
+            "leased": self.leased,
+            "idle": len(self.idle),
+        }
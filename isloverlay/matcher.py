@@ -0,0 +1,115 @@
+# Vectorized gesture template matcher
+import logging
+import numpy as np
+from fastdtw import fastdtw
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import euclidean
+from gesture_store import FRAME_SEQUENCE
+
+logger = logging.getLogger("gestura")
+
+
+# DTW distance between one frame and every template in a (G, N, 3) stack.
+# Same recurrence as a full DTW with euclidean point cost, but each row of the
+# cost matrix is solved for all templates at once with a min-plus prefix scan.
+def batch_dtw(templates, points):
+    cost = np.linalg.norm(
+        templates[:, :, None, :].astype(np.float64) - points[None, None, :, :], axis=-1
+    )
+    acc = np.cumsum(cost[:, 0, :], axis=1)
+    for i in range(1, cost.shape[1]):
+        row = cost[:, i, :]
+        best_prev = np.concatenate(
+            (acc[:, :1], np.minimum(acc[:, 1:], acc[:, :-1])), axis=1
+        )
+        row_sum = np.cumsum(row, axis=1)
+        acc = row_sum + np.minimum.accumulate(best_prev - (row_sum - row), axis=1)
+    return acc[:, -1]
+
+
+# Point-to-point distance (no warping), a single NumPy reduction
+def batch_lockstep(templates, points):
+    return np.linalg.norm(templates - points[None, :, :], axis=-1).sum(axis=-1)
+
+
+METRICS = {"dtw": batch_dtw, "lockstep": batch_lockstep}
+
+
+class GestureMatcher:
+    def __init__(self, store, threshold=0.9, metric="dtw", parity=False, top_words=0, use_index=False, index_radius_scale=1.0):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown matcher metric '{metric}'.")
+        self.threshold = threshold
+        self.metric = metric
+        self.parity = parity
+        self.parity_stats = {"checks": 0, "mismatches": 0}
+        self.names = store.names
+        self.index = store.index
+        self.point_shape = store.point_shape
+        # (stages, gestures, points, 3), contiguous per stage; may be memory-mapped
+        self.templates = store.templates
+        # Coarse-to-fine search: score word centroids first, then only the
+        # variants of the top_words closest words (0 scans every template)
+        self.top_words = top_words
+        self.words = store.words
+        self.word_of = store.word_of
+        self.variants = store.variants
+        self.centroids = store.centroids
+        # Optional KD-tree over flattened start frames. A lockstep distance under
+        # threshold implies a flattened L2 distance under it too, so the radius
+        # query is exact for "lockstep"; for "dtw" it is a prefilter and
+        # index_radius_scale leaves headroom.
+        self.index_radius = threshold * index_radius_scale
+        self.start_tree = None
+        if use_index and self.names:
+            self.start_tree = cKDTree(np.asarray(self.templates[0]).reshape(len(self.names), -1))
+
+    def __len__(self):
+        return len(self.names)
+
+    # Distances from a frame to every template at the given stage; templates
+    # skipped by the coarse search are reported as inf. With parity on, every
+    # template's under-threshold decision is checked against fastdtw, which
+    # also audits what the centroid and KD-tree prefilters leave out.
+    def scores(self, points, stage=0):
+        distances = self._scores(points, stage)
+        if self.parity and points.shape == self.point_shape:
+            for i, distance in enumerate(distances):
+                reference, _ = fastdtw(self.templates[stage, i], points, dist=euclidean)
+                self._record_parity(reference < self.threshold, distance < self.threshold, f"'{self.names[i]}' {FRAME_SEQUENCE[stage]}")
+        return distances
+
+    def _scores(self, points, stage):
+        if not self.names or points.shape != self.point_shape:
+            return np.full(len(self.names), np.inf)
+        if stage == 0 and self.start_tree is not None:
+            candidates = np.array(self.start_tree.query_ball_point(points.ravel(), self.index_radius), dtype=np.intp)
+            distances = np.full(len(self.names), np.inf)
+            if len(candidates):
+                distances[candidates] = METRICS[self.metric](self.templates[stage, candidates], points)
+            return distances
+        if not self.top_words or len(self.words) <= self.top_words:
+            return METRICS[self.metric](self.templates[stage], points)
+        word_distances = METRICS[self.metric](self.centroids[stage], points)
+        top = np.argpartition(word_distances, self.top_words)[:self.top_words]
+        candidates = np.concatenate([self.variants[w] for w in top])
+        distances = np.full(len(self.names), np.inf)
+        distances[candidates] = METRICS[self.metric](self.templates[stage, candidates], points)
+        return distances
+
+    # Distances for (stage, template) pairs, e.g. every live hypothesis at its next stage
+    def pair_distances(self, stages, indices, points):
+        if points.shape != self.point_shape:
+            return np.full(len(indices), np.inf)
+        distances = METRICS[self.metric](self.templates[stages, indices], points)
+        if self.parity:
+            for stage, i, distance in zip(stages, indices, distances):
+                reference, _ = fastdtw(self.templates[stage, i], points, dist=euclidean)
+                self._record_parity(reference < self.threshold, distance < self.threshold, f"'{self.names[i]}' {FRAME_SEQUENCE[stage]}")
+        return distances
+
+    def _record_parity(self, reference, decision, label):
+        self.parity_stats["checks"] += 1
+        if reference != decision:
+            self.parity_stats["mismatches"] += 1
+            logger.warning("⚠️ Matcher parity mismatch at %s: fastdtw=%s %s=%s", label, reference, self.metric, decision)
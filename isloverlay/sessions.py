@@ -0,0 +1,113 @@
+# Per-connection session state and its lifecycle
+#
+# Every websocket gets one Session, registered with the SessionManager for as
+# long as the connection lives. close() is idempotent and runs the release
+# callback exactly once, from the connection handler's cleanup, whether the
+# session ended by disconnect or by going idle (the handler's receive times
+# out). Releasing anywhere else could hand a tracker back to the pool while
+# a worker thread is still running inference on it.
+import itertools
+import sys
+import time
+
+_session_ids = itertools.count(1)
+
+
+def _sizeof(value):
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value)
+    return sys.getsizeof(value)  # numpy arrays include their buffer when they own it
+
+
+class Session:
+    __slots__ = (
+        "websocket", "id", "key", "connected_at", "last_active",
+        "hypotheses", "last_detection_time", "ingest", "transcript", "transcript_mode",
+        "tracker", "detection_frames", "tracking_frames", "inference_timing",
+        "motion_gate", "last_detected", "roi", "last_packet_timestamp", "gesture_version", "recorder",
+        "ack",
+    )
+
+    def __init__(self, websocket, hypotheses, ingest, transcript, transcript_mode="list",
+                 motion_gate=None, roi=None, gesture_version=0, ack=False):
+        self.websocket = websocket
+        # Sessions are registered by id: behind a proxy every client can share
+        # one host:port, so the address is only part of the display label
+        self.id = next(_session_ids)
+        self.key = f"{websocket.client.host}:{websocket.client.port}#{self.id}"
+        self.connected_at = self.last_active = time.time()
+        self.hypotheses = hypotheses
+        self.last_detection_time = 0
+        self.ingest = ingest
+        self.transcript = transcript
+        self.transcript_mode = transcript_mode
+        self.tracker = None
+        self.detection_frames = 0
+        self.tracking_frames = 0
+        self.inference_timing = None
+        self.motion_gate = motion_gate
+        self.last_detected = []
+        self.roi = roi
+        self.last_packet_timestamp = float("-inf")
+        self.gesture_version = gesture_version
+        self.recorder = None  # SessionWriter when recording is enabled
+        self.ack = ack  # Acknowledge every processed frame, for latency measurements
+
+    # Approximate bytes held by this session; pooled trackers are accounted by the pool
+    def footprint(self):
+        hypotheses = self.hypotheses
+        size = sys.getsizeof(self)
+        size += _sizeof(hypotheses.names) + sum(
+            _sizeof(array) for array in (hypotheses.indices, hypotheses.stages, hypotheses.scores, hypotheses.started)
+        )
+        size += sys.getsizeof(self.transcript.words) + sum(sys.getsizeof(word) for word in self.transcript.words)
+        size += _sizeof(self.last_detected)
+        if self.ingest.payload is not None:
+            size += sys.getsizeof(self.ingest.payload)
+        if self.motion_gate is not None and self.motion_gate.reference is not None:
+            size += _sizeof(self.motion_gate.reference)
+        return size
+
+
+class SessionManager:
+    def __init__(self, idle_timeout=2.0, on_close=None):
+        self.idle_timeout = idle_timeout  # Seconds without a message before the handler gives up
+        self.on_close = on_close  # Releases what a session leased, called once per session
+        self.sessions = {}  # id -> Session
+        self.stats = {"opened": 0, "closed": 0, "timed_out": 0}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def open(self, session):
+        self.sessions[session.id] = session
+        self.stats["opened"] += 1
+        return session
+
+    # Unregister and release a session; returns False if it was already closed
+    def close(self, session):
+        if self.sessions.pop(session.id, None) is None:
+            return False
+        self.stats["closed"] += 1
+        if self.on_close is not None:
+            self.on_close(session)
+        return True
+
+    def report(self):
+        now = time.time()
+        sessions = {
+            session.key: {
+                "connected_s": now - session.connected_at,
+                "idle_s": now - session.last_active,
+                "words": len(session.transcript),
+                "approx_bytes": session.footprint(),
+            }
+            for session in self.sessions.values()
+        }
+        return {
+            **self.stats,
+            "live": len(sessions),
+            "idle_timeout": self.idle_timeout,
+            "approx_bytes": sum(s["approx_bytes"] for s in sessions.values()),
+            "sessions": sessions,
+        }
@@ -0,0 +1,32 @@
+# Bounded per-connection transcript with sequence-numbered change events
+#
+# Server -> client messages (JSON text) when the client connects with ?transcript=delta:
+#   {"type": "snapshot", "seq": 7, "base": 0, "words": ["hello", "daughter"]}
+#   {"type": "append", "seq": 8, "index": 2, "word": "go"}
+# `index` is the word's absolute position in the session, `base` the position of
+# the first word still held. Each event bumps `seq` by one; a client that sees a
+# gap sends {"type": "snapshot"} and rebuilds from the reply.
+from collections import deque
+
+
+class Transcript:
+    def __init__(self, max_words=200):
+        self.words = deque(maxlen=max_words)  # Only the newest max_words are kept
+        self.base = 0
+        self.seq = 0
+
+    def __len__(self):
+        return self.base + len(self.words)
+
+    def last(self):
+        return self.words[-1] if self.words else None
+
+    def append(self, word):
+        if len(self.words) == self.words.maxlen:
+            self.base += 1
+        self.words.append(word)
+        self.seq += 1
+        return {"type": "append", "seq": self.seq, "index": len(self) - 1, "word": word}
+
+    def snapshot(self):
+        return {"type": "snapshot", "seq": self.seq, "base": self.base, "words": list(self.words)}
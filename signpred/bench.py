@@ -0,0 +1,124 @@
+# Replay recorded sessions through normalisation and matching at full speed
+# python3 bench.py recordings/*.gsr --repeat 5
+# python3 bench.py --synthesize synthetic.gsr --words 40
+#
+# Sessions are recorded by the server (RECORD_DIR) or the desktop client
+# (--record). Replay uses the recorded timestamps for cooldown and stage
+# timeouts, so the recognitions match what the live run saw; the matcher
+# honours the same MATCHER_* environment variables as the server.
+import argparse
+import time
+import numpy as np
+from gesture_store import load_gesture_store
+from recording import KIND_LANDMARKS, SessionWriter, read_session
+from stage_tracker import StageTracker
+import main as server
+
+
+class ReplayState:
+    def __init__(self):
+        self.hypotheses = StageTracker(len(server.FRAME_SEQUENCE) - 1)
+        self.last_detection_time = 0
+
+
+def load_frames(path):
+    return [(timestamp, hands) for kind, timestamp, hands in read_session(path) if kind == KIND_LANDMARKS]
+
+
+def replay(frames, matcher):
+    state = ReplayState()
+    keypoints = server.keypoints_to_check
+    normalize_times, match_times, events = [], [], []
+    started = time.perf_counter()
+    for timestamp, hands in frames:
+        if not server.begin_frame(state, timestamp, server.COOLDOWN_TIME, server.STAGE_TIMEOUT):
+            continue
+        for landmarks in hands:
+            if landmarks.shape[0] < max(keypoints):
+                continue
+            t0 = time.perf_counter()
+            normalized_keypoints = server.normalize_landmarks(landmarks)[keypoints]
+            t1 = time.perf_counter()
+            _, _, completed = state.hypotheses.step(matcher, normalized_keypoints, timestamp)
+            normalize_times.append(t1 - t0)
+            match_times.append(time.perf_counter() - t1)
+            if completed is not None:
+                events.append((timestamp, *completed))
+                state.last_detection_time = timestamp
+                server.reset_user_state(state)
+    return time.perf_counter() - started, normalize_times, match_times, events
+
+
+def latency(times):
+    if not times:
+        return "-"
+    us = np.array(times) * 1e6
+    p50, p99 = np.percentile(us, [50, 99])
+    return f"{us.mean():.1f}/{p50:.1f}/{p99:.1f}"
+
+
+# Stitch stored keyframes into full 21-point hands, held for a few frames each
+# with jitter, separated by frames with no hand in view
+def synthesize(path, store, words, fps, hold, gap, noise, seed):
+    rng = np.random.default_rng(seed)
+    keypoints = server.keypoints_to_check
+    picks = rng.integers(0, len(store), words)
+    timestamp = 0.0
+    with SessionWriter(path) as writer:
+        for pick in picks:
+            for _ in range(gap):
+                writer.write_landmarks([], timestamp)
+                timestamp += 1 / fps
+            for stage in range(store.templates.shape[0]):
+                for _ in range(hold):
+                    hand = np.zeros((21, 3), dtype=np.float32)
+                    hand[keypoints] = store.templates[stage, pick] + rng.normal(0, noise, store.point_shape)
+                    writer.write_landmarks([hand], timestamp)
+                    timestamp += 1 / fps
+        frames = writer.frames
+    print(f"Wrote {frames} frames ({words} gestures, {timestamp:.1f}s) to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded sessions through the gesture matcher.")
+    parser.add_argument("sessions", nargs="*")
+    parser.add_argument("--gestures", default="gestures.json")
+    parser.add_argument("--repeat", type=int, default=3, help="Replays per session; the fastest is reported")
+    parser.add_argument("--events", action="store_true", help="List every recognition")
+    parser.add_argument("--synthesize", metavar="PATH", help="Write a synthetic session built from the gesture templates")
+    parser.add_argument("--words", type=int, default=40)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--hold", type=int, default=3, help="Frames per keyframe in synthetic sessions")
+    parser.add_argument("--gap", type=int, default=20, help="Frames without a hand between synthetic gestures")
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = load_gesture_store(args.gestures)
+    if args.synthesize:
+        synthesize(args.synthesize, store, args.words, args.fps, args.hold, args.gap, args.noise, args.seed)
+        args.sessions.append(args.synthesize)
+    if not args.sessions:
+        parser.error("no sessions to replay")
+    matcher = server.build_matcher(store)
+
+    print(f"{'session':<32} {'frames':>7} {'hands':>6} {'frames/s':>10} {'normalize us':>18} {'match us':>18} {'words':>6}")
+    print(f"{'':<32} {'':>7} {'':>6} {'':>10} {'mean/p50/p99':>18} {'mean/p50/p99':>18} {'':>6}")
+    for path in args.sessions:
+        frames = load_frames(path)
+        runs = [replay(frames, matcher) for _ in range(max(args.repeat, 1))]
+        elapsed, normalize_times, match_times, events = min(runs, key=lambda run: run[0])
+        hands = sum(len(h) for _, h in frames)
+        fps = len(frames) / elapsed if elapsed > 0 else float("inf")
+        print(
+            f"{path[-32:]:<32} {len(frames):>7} {hands:>6} {fps:>10.0f} "
+            f"{latency(normalize_times):>18} {latency(match_times):>18} {len(events):>6}"
+        )
+        if args.events:
+            start = frames[0][0] if frames else 0.0
+            for timestamp, name, score in events:
+                print(f"    {timestamp - start:8.2f}s  {name} (distance {score:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Benchmark stage-0 matching: brute-force scan vs KD-tree index vs word centroids
+# python3 bench_matcher.py --sizes 100 1000 10000 --frames 200
+#
+# Synthetic vocabularies are built by jittering the recorded templates in
+# gestures.json, with --variants recordings per word. Queries are jittered
+# copies of random templates. Recall is the share of brute-force matches under
+# threshold that each mode also returns.
+import argparse
+import time
+import numpy as np
+from gesture_store import GestureStore, load_gesture_store
+from matcher import GestureMatcher
+
+
+def synthetic_store(base, size, variants, rng):
+    words = -(-size // variants)
+    picks = rng.integers(0, base.shape[1], words)
+    word_templates = base[:, picks] + rng.normal(0, 0.05, (base.shape[0], words) + base.shape[2:])
+    templates = np.repeat(word_templates, variants, axis=1)[:, :size]
+    templates = templates + rng.normal(0, 0.02, templates.shape)
+    names = [f"w{i // variants}_{i % variants}" for i in range(size)]
+    return GestureStore(names, np.ascontiguousarray(templates, dtype=np.float32))
+
+
+def run(matcher, queries):
+    started = time.perf_counter()
+    results = [matcher.scores(q) for q in queries]
+    return (time.perf_counter() - started) / len(queries), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare stage-0 matcher search modes.")
+    parser.add_argument("--gestures", default="gestures.json")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--variants", type=int, default=8)
+    parser.add_argument("--metric", default="dtw", choices=["dtw", "lockstep"])
+    parser.add_argument("--threshold", type=float, default=0.9)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    base = np.asarray(load_gesture_store(args.gestures).templates, dtype=np.float64)
+    print(f"{'templates':>9} {'mode':>9} {'us/frame':>10} {'speedup':>8} {'recall':>7}")
+    for size in args.sizes:
+        store = synthetic_store(base, size, args.variants, rng)
+        picks = rng.integers(0, size, args.frames)
+        queries = (store.templates[0, picks] + rng.normal(0, 0.03, (args.frames,) + store.point_shape)).astype(np.float32)
+
+        modes = {
+            "brute": GestureMatcher(store, args.threshold, args.metric),
+            "kdtree": GestureMatcher(store, args.threshold, args.metric, use_index=True),
+            "centroid": GestureMatcher(store, args.threshold, args.metric, top_words=8),
+        }
+        brute_time, brute = run(modes["brute"], queries)
+        for mode, matcher in modes.items():
+            elapsed, results = (brute_time, brute) if mode == "brute" else run(matcher, queries)
+            found = sum(np.count_nonzero((b < args.threshold) & (r < args.threshold)) for b, r in zip(brute, results))
+            expected = sum(np.count_nonzero(b < args.threshold) for b in brute)
+            recall = found / expected if expected else 1.0
+            print(f"{size:>9} {mode:>9} {elapsed * 1e6:>10.1f} {brute_time / elapsed:>7.1f}x {recall:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
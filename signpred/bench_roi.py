@@ -0,0 +1,82 @@
+# Benchmark MediaPipe Hands on full frames vs hand ROI crops over recorded clips
+# python3 bench_roi.py clip1.mp4 clip2.mp4 --width 1280 --height 720
+#
+# Each clip is decoded once (optionally resized to --width/--height), then run
+# through a fresh tracking Hands graph per mode. Agreement is the mean distance
+# between full-frame and ROI landmarks on frames where both found a hand, in
+# normalised image units.
+import argparse
+import time
+import cv2
+import numpy as np
+from inference import detect_landmarks, initialize_mediapipe
+from roi import HandROI
+
+
+def read_clip(path, size, limit):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, size) if size else frame)
+    cap.release()
+    return frames
+
+
+def run(frames, roi, max_num_hands):
+    hands = initialize_mediapipe(max_num_hands)
+    outputs = []
+    started = time.perf_counter()
+    for frame in frames:
+        box = roi.region() if roi is not None else None
+        detected, _ = detect_landmarks(frame, hands, box)
+        if roi is not None:
+            roi.update(detected, frame.shape)
+        outputs.append(detected)
+    elapsed = time.perf_counter() - started
+    hands.close()
+    return elapsed / len(frames), outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full-frame and hand ROI inference cost.")
+    parser.add_argument("clips", nargs="+", help="recorded video files")
+    parser.add_argument("--width", type=int, default=0, help="resize frames before inference, 0 keeps the clip size")
+    parser.add_argument("--height", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=600, help="frames used per clip")
+    parser.add_argument("--margin", type=float, default=0.3)
+    parser.add_argument("--full-every", type=int, default=30)
+    parser.add_argument("--hands", type=int, default=1, help="max_num_hands for the graph")
+    args = parser.parse_args()
+
+    size = (args.width, args.height) if args.width and args.height else None
+    print(f"{'clip':>20} {'size':>10} {'mode':>5} {'ms/frame':>9} {'fps':>7} {'hands':>6} {'crops':>6} {'agree':>7}")
+    for path in args.clips:
+        frames = read_clip(path, size, args.frames)
+        if not frames:
+            print(f"❌ No frames read from {path}")
+            continue
+        height, width = frames[0].shape[:2]
+        full_time, full = run(frames, None, args.hands)
+        roi = HandROI(args.margin, full_every=args.full_every)
+        roi_time, cropped = run(frames, roi, args.hands)
+
+        deviations = [
+            np.abs(a[0][:, :2] - b[0][:, :2]).mean() for a, b in zip(full, cropped) if a and b
+        ]
+        agree = f"{np.mean(deviations):.4f}" if deviations else "-"
+        for mode, elapsed, outputs, crops in (
+            ("full", full_time, full, "-"),
+            ("roi", roi_time, cropped, f"{roi.report()['crop_rate'] * 100:.0f}%"),
+        ):
+            found = sum(1 for detected in outputs if detected) / len(outputs)
+            print(
+                f"{path[-20:]:>20} {f'{width}x{height}':>10} {mode:>5} {elapsed * 1000:>9.2f} "
+                f"{1 / elapsed:>7.1f} {found * 100:>5.0f}% {crops:>6} {agree if mode == 'roi' else '-':>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
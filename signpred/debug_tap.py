@@ -0,0 +1,67 @@
+# Sampled in-memory tap of decoded frames for debugging
+#
+# Off by default. When enabled, every sample_every-th decoded frame of each
+# connection is kept (as the decoded array, not re-encoded) in a ring buffer
+# of the last `capacity` samples. Frames are only JPEG-encoded when read over
+# HTTP or flushed to disk, and flushing runs off the event loop.
+import asyncio
+import os
+import time
+from collections import deque
+import cv2
+
+
+class DebugTap:
+    def __init__(self, enabled=False, sample_every=30, capacity=32):
+        self.enabled = enabled
+        self.sample_every = sample_every
+        self.frames = deque(maxlen=capacity)  # (sample_id, connection, frame_number, captured_at, img, rgb)
+        self.next_id = 0
+        self.flushed = 0
+
+    # Keep the frame if sampling picks it; frame_number is counted per connection
+    def capture(self, connection, frame_number, img, rgb=False):
+        if not self.enabled or frame_number % self.sample_every != 0:
+            return
+        self.frames.append((self.next_id, connection, frame_number, time.time(), img, rgb))
+        self.next_id += 1
+
+    def list(self):
+        return [
+            {"id": sample_id, "connection": connection, "frame": frame_number,
+             "captured_at": captured_at, "width": img.shape[1], "height": img.shape[0]}
+            for sample_id, connection, frame_number, captured_at, img, _ in self.frames
+        ]
+
+    # JPEG bytes of one buffered sample, or None if it has been overwritten
+    def encode(self, sample_id):
+        for entry_id, _, _, _, img, rgb in self.frames:
+            if entry_id == sample_id:
+                ok, buf = cv2.imencode(".jpg", cv2.cvtColor(img, cv2.COLOR_RGB2BGR) if rgb else img)
+                return buf.tobytes() if ok else None
+        return None
+
+    def _write(self, directory, entries):
+        os.makedirs(directory, exist_ok=True)
+        for sample_id, connection, frame_number, _, img, rgb in entries:
+            name = f"{sample_id:06d}_{connection.replace(':', '_')}_{frame_number}.jpg"
+            cv2.imwrite(os.path.join(directory, name), cv2.cvtColor(img, cv2.COLOR_RGB2BGR) if rgb else img)
+        return len(entries)
+
+    # Write the buffered samples to disk on a worker thread; returns how many were written
+    async def flush(self, directory):
+        entries = list(self.frames)
+        self.frames.clear()
+        written = await asyncio.get_running_loop().run_in_executor(None, self._write, directory, entries)
+        self.flushed += written
+        return written
+
+    def report(self):
+        return {
+            "enabled": self.enabled,
+            "sample_every": self.sample_every,
+            "capacity": self.frames.maxlen,
+            "buffered": len(self.frames),
+            "sampled": self.next_id,
+            "flushed": self.flushed,
+        }
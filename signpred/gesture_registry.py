@@ -0,0 +1,82 @@
+# Watched gesture registry with hot reload
+import asyncio
+import logging
+import os
+import time
+from gesture_store import load_gesture_store
+
+logger = logging.getLogger("gestura")
+
+
+class GestureRegistry:
+    def __init__(self, json_path, build_matcher, poll_interval=1.0):
+        self.json_path = json_path
+        self.build_matcher = build_matcher  # GestureStore -> matcher
+        self.poll_interval = poll_interval
+        self.version = 0
+        self.matcher = None
+        self.signature = None
+        self.failed_signature = None
+        self.stats = {"reloads": 0, "failures": 0, "last_reload_ms": None, "reloaded_at": None}
+        self.load()
+
+    # (mtime, size) of the JSON, or None if it is missing
+    def _signature(self):
+        try:
+            stat = os.stat(self.json_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _build(self):
+        started = time.perf_counter()
+        matcher = self.build_matcher(load_gesture_store(self.json_path))
+        return matcher, time.perf_counter() - started
+
+    # Swapping is a single assignment on the event loop, so a frame sees either set, never a mix
+    def _swap(self, matcher, duration, signature):
+        self.matcher = matcher
+        self.signature = signature
+        self.version += 1
+        self.stats["last_reload_ms"] = duration * 1000
+        self.stats["reloaded_at"] = time.time()
+
+    # Blocking load, used at startup before the event loop serves anything
+    def load(self):
+        signature = self._signature()
+        matcher, duration = self._build()
+        self._swap(matcher, duration, signature)
+
+    # Build the new templates in a worker thread, then swap them in
+    async def reload(self):
+        signature = self._signature()
+        try:
+            matcher, duration = await asyncio.get_running_loop().run_in_executor(None, self._build)
+        except Exception as e:
+            # The recorders rewrite the JSON in place, so a half-written file is retried on its next change
+            self.stats["failures"] += 1
+            self.failed_signature = signature
+            logger.warning("Gesture reload failed: %s", e)
+            return False
+        self._swap(matcher, duration, signature)
+        self.stats["reloads"] += 1
+        logger.info("Reloaded %d gestures in %.1fms", len(matcher), duration * 1000)
+        return True
+
+    # Poll the JSON and reload when it changes; runs until cancelled
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            signature = self._signature()
+            if signature != self.signature and signature != self.failed_signature:
+                await self.reload()
+
+    def report(self):
+        return {
+            "source": self.json_path,
+            "version": self.version,
+            "templates": len(self.matcher),
+            # fastdtw cross-checks of the current matcher (MATCHER_PARITY=1); restart on reload
+            "parity": dict(self.matcher.parity_stats) if self.matcher.parity else None,
+            **self.stats,
+        }
@@ -0,0 +1,64 @@
+# Latest-frame-wins ingestion with adaptive frame skipping
+import asyncio
+
+
+class FrameIngest:
+    def __init__(self, target_latency=0.1, skip=3, max_skip=8, smoothing=0.2):
+        self.target_latency = target_latency
+        self.skip = skip  # Only every skip-th received payload becomes a candidate
+        self.max_skip = max_skip
+        self.smoothing = smoothing
+        self.latency = None  # Smoothed processing latency in seconds
+        self.payload = None
+        self.sequence = 0  # Receive number of the pending payload
+        self.current = 0  # Receive number of the payload last handed to the consumer
+        self.error = None
+        self.ready = asyncio.Event()
+        self.counters = {"received": 0, "skipped": 0, "dropped": 0, "decoded": 0, "processed": 0}
+
+    # Called by the receiver for every raw payload; never decodes
+    def put(self, data):
+        self.counters["received"] += 1
+        if self.counters["received"] % self.skip != 0:
+            self.counters["skipped"] += 1
+            return
+        if self.payload is not None:
+            self.counters["dropped"] += 1
+        self.payload = data
+        self.sequence = self.counters["received"]
+        self.ready.set()
+
+    # Stop ingestion; the consumer re-raises the error on its next wait
+    def close(self, error):
+        self.error = error
+        self.ready.set()
+
+    # Wait for the newest undecoded payload
+    async def next_payload(self):
+        while self.payload is None:
+            if self.error is not None:
+                raise self.error
+            self.ready.clear()
+            await self.ready.wait()
+        data, self.payload = self.payload, None
+        self.current = self.sequence
+        return data
+
+    # Feed back how long a decoded frame took to process and retune the skip ratio
+    def record(self, latency):
+        self.counters["processed"] += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+        if self.latency > self.target_latency:
+            self.skip = min(self.skip + 1, self.max_skip)
+        elif self.latency < self.target_latency / 2:
+            self.skip = max(self.skip - 1, 1)
+
+    def report(self):
+        return {
+            **self.counters,
+            "skip": self.skip,
+            "latency_ms": 1000 * self.latency if self.latency is not None else None,
+        }
@@ -29,6 +29,7 @@ class _CameraStreamAppState extends State<CameraStreamApp> {
   String _detectedSign = "Waiting for sign...";
   bool _isCameraInitialized = false;
   List<String> _detectedWords = [];
+  int _transcriptSeq = 0;
   FlutterTts flutterTts = FlutterTts();
 
   @override
@@ -74,19 +75,17 @@ class _CameraStreamAppState extends State<CameraStreamApp> {
   void _initWebSocket() {
     _channel?.sink.close();
     _channel = WebSocketChannel.connect(
-      Uri.parse("ws://192.168.17.170:8000/ws"),
+      Uri.parse("ws://192.168.17.170:8000/ws?transcript=delta"),
     );
 
     _channel?.stream.listen(
       (message) {
         try {
-          final List<dynamic> receivedWords = jsonDecode(
+          final Map<String, dynamic> event = jsonDecode(
             message,
           ); // Decode the incoming JSON
           setState(() {
-            _detectedWords =
-                receivedWords
-                    .cast<String>(); // Replace the list with received words
+            _applyTranscriptEvent(event);
             _detectedSign = _detectedWords.toString();
           });
           print("Updated Detected Words: $_detectedWords");
@@ -100,6 +99,29 @@ class _CameraStreamAppState extends State<CameraStreamApp> {
     );
   }
 
+  // The server sends only what changed; keep the whole session here and ask
+  // for a snapshot whenever an event is missed
+  void _applyTranscriptEvent(Map<String, dynamic> event) {
+    if (event["type"] != "snapshot" && event["type"] != "append") return;
+    final int seq = event["seq"];
+    if (event["type"] == "snapshot") {
+      final int base = event["base"];
+      _detectedWords = [
+        ..._detectedWords.take(base),
+        ...(event["words"] as List<dynamic>).cast<String>(),
+      ];
+      _transcriptSeq = seq;
+      return;
+    }
+    final int index = event["index"];
+    if (seq != _transcriptSeq + 1 || index != _detectedWords.length) {
+      _channel?.sink.add(jsonEncode({"type": "snapshot"}));
+      return;
+    }
+    _transcriptSeq = seq;
+    _detectedWords.add(event["word"]);
+  }
+
   void _startStreaming() {
     if (!_cameraController.value.isInitialized) {
       print("Camera not initialized yet.");
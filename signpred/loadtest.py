@@ -0,0 +1,236 @@
+# Websocket load test: frame latency and drops against concurrency
+# python3 loadtest.py --spawn --clients 1 2 4 8 16 --fps 15 --duration 10
+# python3 loadtest.py --url ws://127.0.0.1:8000 --frames recordings/session.gsr --clients 4
+#
+# Each client streams JPEG frames to /ws?transcript=delta&ack=1 at --fps. The
+# server acknowledges every frame it processes with the frame's receive number,
+# so frame RTT is send -> ack; frames the ingest skips or drops never get one.
+# Word RTT is send -> transcript event for the frame that completed a gesture,
+# so it only shows up when the frames contain signing (a directory of captured
+# frames or a recording made with RECORD_JPEG=1). Server-side drops come from
+# /ingest_stats and /inference_stats. --spawn starts a local server with the
+# stub sentence backend, so nothing leaves the machine.
+import argparse
+import asyncio
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+import cv2
+import numpy as np
+import websockets
+from recording import KIND_JPEG, read_session
+
+
+def load_frames(path):
+    if path.endswith(".gsr"):
+        frames = [payload for kind, _, payload in read_session(path) if kind == KIND_JPEG]
+    else:
+        frames = []
+        for name in sorted(glob.glob(os.path.join(path, "*.jpg")) + glob.glob(os.path.join(path, "*.jpeg"))):
+            with open(name, "rb") as f:
+                frames.append(f.read())
+    if not frames:
+        raise SystemExit(f"No JPEG frames found in {path}")
+    return frames
+
+
+# Noisy frames with a moving blob, so the motion gate and hand detector do real work
+def generate_frames(count, width, height, quality, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        img = rng.integers(60, 120, (height, width, 3), dtype=np.uint8)
+        angle = 2 * np.pi * i / count
+        center = (int(width / 2 + width / 4 * np.cos(angle)), int(height / 2 + height / 4 * np.sin(angle)))
+        cv2.circle(img, center, min(width, height) // 8, (90, 150, 210), -1)
+        frames.append(cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes())
+    return frames
+
+
+def get_json(base, path):
+    with urllib.request.urlopen(base + path, timeout=10) as response:
+        return json.load(response)
+
+
+class ClientStats:
+    def __init__(self):
+        self.sent = 0
+        self.acked = 0
+        self.words = 0
+        self.frame_rtt = []
+        self.word_rtt = []
+        self.send_time = 0.0
+
+
+async def run_client(url, frames, fps, duration, offset, stats, drained, release, drain_time):
+    sent = {}  # frame number -> send time
+    words = []  # Arrival times of transcript events not yet tied to a frame
+    async with websockets.connect(url, max_size=None) as ws:
+        async def receive():
+            async for message in ws:
+                now = time.perf_counter()
+                event = json.loads(message)
+                kind = event.get("type")
+                if kind == "ack":
+                    sent_at = sent.pop(event["frame"], None)
+                    if sent_at is None:
+                        continue
+                    stats.acked += 1
+                    stats.frame_rtt.append(now - sent_at)
+                    # The server sends a frame's transcript events just before its ack
+                    stats.word_rtt.extend(arrived - sent_at for arrived in words)
+                    words.clear()
+                elif kind == "append":
+                    stats.words += 1
+                    words.append(now)
+
+        receiver = asyncio.create_task(receive())
+        interval = 1 / fps
+        await asyncio.sleep(offset * interval)  # Stagger clients so they don't send in lockstep
+        started = time.perf_counter()
+        number = 0
+        while number * interval < duration:
+            delay = started + number * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            number += 1
+            sent[number] = time.perf_counter()
+            await ws.send(frames[(number + int(offset * len(frames))) % len(frames)])
+        stats.send_time = time.perf_counter() - started
+        stats.sent = number
+        await asyncio.sleep(drain_time)  # Let the last processed frames come back
+        drained.set()
+        await release.wait()
+        receiver.cancel()
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return [None] * len(points)
+    return (np.percentile(np.array(values) * 1000, points)).tolist()
+
+
+def fmt(values):
+    return "/".join("-" if v is None else f"{v:.0f}" for v in values)
+
+
+async def run_level(url, base, frames, clients, args):
+    inference_before = get_json(base, "/inference_stats")
+    stats = [ClientStats() for _ in range(clients)]
+    drained = [asyncio.Event() for _ in range(clients)]
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(run_client(url, frames, args.fps, args.duration, i / clients, stats[i], drained[i], release, args.drain))
+        for i in range(clients)
+    ]
+    # Read the per-connection counters while every session is still open
+    await asyncio.gather(*(event.wait() for event in drained))
+    ingest = await asyncio.to_thread(get_json, base, "/ingest_stats")
+    inference = await asyncio.to_thread(get_json, base, "/inference_stats")
+    release.set()
+    await asyncio.gather(*tasks)
+
+    sent = sum(s.sent for s in stats)
+    totals = {key: sum(c[key] for c in ingest.values()) for key in ("received", "skipped", "dropped", "processed")}
+    received = totals["received"] or 1
+    return {
+        "clients": clients,
+        "send_fps": sum(s.sent / s.send_time for s in stats if s.send_time),
+        "sent": sent,
+        "acked": sum(s.acked for s in stats),
+        "frame_rtt_ms": percentiles([r for s in stats for r in s.frame_rtt]),
+        "word_rtt_ms": percentiles([r for s in stats for r in s.word_rtt], (50, 99)),
+        "words": sum(s.words for s in stats),
+        "server": totals,
+        "skipped_rate": totals["skipped"] / received,
+        "dropped_rate": totals["dropped"] / received,
+        "inference_dropped": inference["dropped"] - inference_before["dropped"],
+        "inference_compute_ms": inference["avg_compute_ms"],
+    }
+
+
+def spawn_server(port, timeout=120):
+    base = f"http://127.0.0.1:{port}"
+    try:
+        get_json(base, "/ready")
+    except OSError:
+        pass
+    else:
+        raise SystemExit(f"Something is already listening on port {port}")
+    env = {"LOG_LEVEL": "WARNING", **os.environ, "NLP_BACKEND": "stub"}  # Connection logs would bury the report
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"Server exited with code {server.returncode}")
+        try:
+            if get_json(base, "/ready")["ready"]:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise SystemExit("Server did not become ready")
+
+
+async def run(args, frames):
+    url = args.url.rstrip("/") + "/ws?transcript=delta&ack=1"
+    base = "http" + args.url.rstrip("/")[2:]
+    print(f"{len(frames)} frames of {sum(map(len, frames)) // len(frames) // 1024} KiB, {args.fps:g} fps per client, {args.duration:g}s per level")
+    print(f"{'clients':>7} {'send fps':>9} {'acked':>6} {'frame rtt ms':>14} {'word rtt ms':>12} {'words':>6} {'skipped':>8} {'dropped':>8} {'inf drop':>9} {'compute':>8}")
+    print(f"{'':>7} {'':>9} {'':>6} {'p50/p90/p99':>14} {'p50/p99':>12} {'':>6} {'':>8} {'':>8} {'':>9} {'ms':>8}")
+    results = []
+    for clients in args.clients:
+        result = await run_level(url, base, frames, clients, args)
+        results.append(result)
+        print(
+            f"{clients:>7} {result['send_fps']:>9.1f} {result['acked'] / max(result['sent'], 1) * 100:>5.0f}% "
+            f"{fmt(result['frame_rtt_ms']):>14} {fmt(result['word_rtt_ms']):>12} {result['words']:>6} "
+            f"{result['skipped_rate'] * 100:>7.0f}% {result['dropped_rate'] * 100:>7.0f}% "
+            f"{result['inference_dropped']:>9} {result['inference_compute_ms']:>8.1f}"
+        )
+    within = [r["clients"] for r in results if r["frame_rtt_ms"][2] is not None and r["frame_rtt_ms"][2] <= args.slo]
+    print(f"Sustained with p99 frame RTT <= {args.slo:g} ms: {max(within) if within else 'none'} clients")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /ws latency and drops against the number of clients.")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="Start a local server with NLP_BACKEND=stub on the --url port")
+    parser.add_argument("--frames", help="Directory of .jpg files or a .gsr recording with JPEG frames; generated if omitted")
+    parser.add_argument("--size", default="640x480", help="Generated frame size")
+    parser.add_argument("--quality", type=int, default=80, help="Generated frame JPEG quality")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--fps", type=float, default=15)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds each client streams per level")
+    parser.add_argument("--drain", type=float, default=1.0, help="Seconds to wait for acks after the last frame")
+    parser.add_argument("--slo", type=float, default=250, help="p99 frame RTT budget in ms for the summary line")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    if args.frames:
+        frames = load_frames(args.frames)
+    else:
+        width, height = map(int, args.size.split("x"))
+        frames = generate_frames(int(args.fps * 4), width, height, args.quality)
+    server = spawn_server(int(args.url.rsplit(":", 1)[1].split("/")[0])) if args.spawn else None
+    try:
+        asyncio.run(run(args, frames))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
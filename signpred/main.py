@@ -1,20 +1,35 @@
 # python3 -m uvicorn main:app --host 0.0.0.0 --port 8000 --reload
 # Import necessary libraries
 import asyncio
-import cv2
 import numpy as np
 import uvicorn
-import mediapipe as mp
 import json
+import logging
 import os
 import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastdtw import fastdtw
-from scipy.spatial.distance import euclidean
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 from google import genai
 from typing import List
 from pydantic import BaseModel
+from gesture_registry import GestureRegistry
+from matcher import GestureMatcher, FRAME_SEQUENCE
+from metrics import Metrics
+from inference import InferenceExecutor, TrackerPool
+from ingest import FrameIngest
+from debug_tap import DebugTap
+from decode import decode_frame
+from motion import MotionGate
+from roi import HandROI
+from protocol import is_landmark_packet, parse_landmark_packet
+from recording import SessionWriter
+from sentences import GeminiBackend, SentenceService, StubBackend
+from sessions import Session, SessionManager
+from startup import Startup
+from stage_tracker import StageTracker
+from transcript import Transcript
 
 # NLP class using pydantic and typing for auto-type checks
 class NLPRequest(BaseModel):
@@ -28,30 +43,6 @@ def load_environment_variables():
         raise Exception("API key not set.")
     return api_key
 
-# Initialize Mediapipe
-def initialize_mediapipe():
-    return mp.solutions.hands.Hands(
-        min_detection_confidence=0.7, min_tracking_confidence=0.7
-    )
-
-# Load gesture data
-def load_gesture_data(file_path):
-    if os.path.exists(file_path):
-        with open(file_path, "r") as f:
-            gesture_dict = json.load(f)
-            gesture_dict = {
-                k: {
-                    "start": np.array(v["start"], dtype=np.float32),
-                    "mid1": np.array(v["mid1"], dtype=np.float32),
-                    "mid2": np.array(v["mid2"], dtype=np.float32),
-                    "end": np.array(v["end"], dtype=np.float32),
-                }
-                for k, v in gesture_dict.items()
-            }
-        print(gesture_dict)
-        return gesture_dict
-    return {}
-
 # Normalize landmarks
 def normalize_landmarks(landmarks):
     min_x, min_y, _ = np.min(landmarks, axis=0)
@@ -62,139 +53,458 @@ def normalize_landmarks(landmarks):
     scale = max(max_x - min_x, max_y - min_y)
     return centered_landmarks / scale if scale > 0 else centered_landmarks
 
+# Enforce cooldown and stage timeout; returns False while cooling down
+def begin_frame(state, current_time, cooldown_time, stage_timeout):
+    if current_time - state.last_detection_time < cooldown_time:
+        return False
+
+    state.hypotheses.expire(current_time, stage_timeout)
+    return True
+
 # Handle frame processing
-async def process_frame(img, state, hands, gesture_dict, frame_sequence, keypoints_to_check, cooldown_time, stage_timeout, websocket):
+async def process_frame(img, state, executor, matcher, frame_sequence, keypoints_to_check, cooldown_time, stage_timeout, websocket):
     current_time = time.time()
+    if not begin_frame(state, current_time, cooldown_time, stage_timeout):
+        return
+
+    # Static scene: reuse the last landmarks instead of running the hand graph again
+    motion_gate = state.motion_gate
+    if motion_gate is not None and not motion_gate.check(img, current_time):
+        await match_hands(state.last_detected, state, matcher, frame_sequence, keypoints_to_check, current_time, websocket)
+        return
+
+    # Count whether this frame hits the cheap tracking path or full palm detection
+    tracker = state.tracker
+    if tracker is not None and tracker.tracking:
+        state.tracking_frames += 1
+    else:
+        state.detection_frames += 1
 
-    # Enforce cooldown
-    if current_time - state["last_detection_time"] < cooldown_time:
+    # Colour conversion and hands.process run in the inference pool, on the hand's region if known
+    roi = state.roi
+    box = roi.region() if roi is not None else None
+    inference = await executor.run(img, tracker, box, rgb=True)
+    if inference is None:
+        logger.debug("inference queue full, dropping frame for %s", state.key)
         return
+    detected, timing = inference
+    if roi is not None:
+        roi.update(detected, img.shape)
+    state.last_detected = detected
+    state.inference_timing = timing
+    metrics.observe("inference_wait", timing["wait"])
+    metrics.observe("prepare", timing["prepare"])
+    metrics.observe("hands_process", timing["hands"])
+    metrics.observe("landmarks", timing["landmarks"])
+    logger.debug("inference wait %.1fms, compute %.1fms", timing["wait"] * 1000, timing["compute"] * 1000)
+    await match_hands(detected, state, matcher, frame_sequence, keypoints_to_check, current_time, websocket)
 
-    # Handle stage timeout
-    if state["frame_stage"] > 0 and state["stage_start_time"] is not None:
-        if current_time - state["stage_start_time"] > stage_timeout:
-            reset_user_state(state)
+# Handle landmarks tracked on the client, skipping decode and inference
+async def process_landmark_packet(data, state, matcher, frame_sequence, keypoints_to_check, cooldown_time, stage_timeout, websocket):
+    detected, timestamp = parse_landmark_packet(data)
+    # Packets are only useful in order; a stale one would rewind the stage machine
+    if timestamp <= state.last_packet_timestamp:
+        return
+    state.last_packet_timestamp = timestamp
 
-    rgb_frame = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb_frame)
+    current_time = time.time()
+    if not begin_frame(state, current_time, cooldown_time, stage_timeout):
+        return
+    await match_hands(detected, state, matcher, frame_sequence, keypoints_to_check, current_time, websocket)
 
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            landmarks = np.array(
-                [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32
-            )
-            if landmarks.shape[0] < max(keypoints_to_check):
-                continue
+# Normalize each detected hand and run it through the matcher
+async def match_hands(detected, state, matcher, frame_sequence, keypoints_to_check, current_time, websocket):
+    if state.recorder is not None:
+        state.recorder.write_landmarks(detected, current_time)
+    for landmarks in detected:
+        if landmarks.shape[0] < max(keypoints_to_check):
+            continue
 
-            normalized_landmarks = normalize_landmarks(landmarks)
-            normalized_keypoints = normalized_landmarks[keypoints_to_check]
-            await handle_gesture_matching(
-                normalized_keypoints, state, gesture_dict, frame_sequence, current_time, websocket
-            )
+        normalize_started = time.perf_counter()
+        normalized_landmarks = normalize_landmarks(landmarks)
+        normalized_keypoints = normalized_landmarks[keypoints_to_check]
+        metrics.observe("normalize", time.perf_counter() - normalize_started)
+        await handle_gesture_matching(
+            normalized_keypoints, state, matcher, frame_sequence, current_time, websocket
+        )
 
 # Handle gesture matching
-async def handle_gesture_matching(normalized_keypoints, state, gesture_dict, frame_sequence, current_time, websocket):
-    if state["frame_stage"] == 0:
-        for gesture_name, frames in gesture_dict.items():
-            keyframe_points = frames["start"].reshape(-1, 3)
-            if keyframe_points.shape != normalized_keypoints.shape:
-                print("normalize check failed")
-                continue
-            distance, _ = fastdtw(keyframe_points, normalized_keypoints, dist=euclidean)
-            if distance < 0.9:
-                state["pending_gesture"] = gesture_name
-                state["frame_stage"] = 1
-                state["stage_start_time"] = current_time
-                print(f"🟢 'Start' frame matched for '{gesture_name}'!")
-                ###
-                break
-    elif state["pending_gesture"]:
-        stage_name = frame_sequence[state["frame_stage"]]
-        keyframe_points = gesture_dict[state["pending_gesture"]][stage_name].reshape(-1, 3)
-        if keyframe_points.shape == normalized_keypoints.shape:
-            distance, _ = fastdtw(keyframe_points, normalized_keypoints, dist=euclidean)
-            if distance < 0.9:
-                print(f"🟢 '{stage_name.capitalize()}' frame matched for '{state['pending_gesture']}'!")
-                state["frame_stage"] += 1
-                state["stage_start_time"] = current_time
-                if state["frame_stage"] == 3:
-                    if(len(state["detected_words"])==0 or state["detected_words"][-1].split('_')[0]!=state["pending_gesture"].split('_')[0]):
-                        state["detected_words"].append(state["pending_gesture"].split('_')[0])
-                    # print(state["detected_words"])
-                    await websocket.send_text(json.dumps(state["detected_words"]))
-                    # print(state["detected_words"])
-                    print(f"✅ Detected Sign: {state['pending_gesture']}")
-                    state["last_detection_time"] = current_time
-                    reset_user_state(state)
+async def handle_gesture_matching(normalized_keypoints, state, matcher, frame_sequence, current_time, websocket):
+    match_started = time.perf_counter()
+    started, advanced, completed = state.hypotheses.step(matcher, normalized_keypoints, current_time)
+    metrics.observe("match", time.perf_counter() - match_started)
+    if started:
+        logger.debug("🟢 '%s' frame matched for %s!", frame_sequence[0].capitalize(), started)
+    if advanced:
+        logger.debug("🟢 Next frame matched for %s!", advanced)
+    if completed is not None:
+        gesture_name, score = completed
+        word = gesture_name.split('_')[0]
+        if state.transcript.last() != word:
+            await send_transcript_event(websocket, state, state.transcript.append(word))
+        metrics.inc("signs_detected")
+        logger.info("✅ Detected Sign: %s (distance %.2f)", gesture_name, score)
+        state.last_detection_time = current_time
+        reset_user_state(state)
+
+# Delta clients get the event itself; list clients still get the (windowed) word list
+async def send_transcript_event(websocket, state, event):
+    if state.transcript_mode == "delta":
+        await websocket.send_text(json.dumps(event))
+    else:
+        await websocket.send_text(json.dumps(list(state.transcript.words)))
+
+# With ?ack=1 every processed payload is acknowledged with its receive number
+# on the connection (1 for the first binary message), e.g. {"type": "ack", "frame": 12}.
+# Frames skipped or dropped by the ingest never get one.
+async def send_ack(websocket, state):
+    if state.ack:
+        await websocket.send_text(json.dumps({"type": "ack", "frame": state.ingest.current}))
+
+# Handle a JSON control message sent by the client as text
+async def handle_client_message(text, state, websocket):
+    try:
+        message = json.loads(text)
+    except ValueError:
+        message = None
+    if not isinstance(message, dict):
+        logger.warning("Bad control message from %s: %s", websocket.client, text[:80])
+        return
+    if message.get("type") == "snapshot":
+        await websocket.send_text(json.dumps(state.transcript.snapshot()))
 
 # Reset user state
 def reset_user_state(state):
-    state["pending_gesture"] = None
-    state["frame_stage"] = 0
-    state["stage_start_time"] = None
+    state.hypotheses.clear()
+
+# Build the matcher for a (re)loaded gesture store
+def build_matcher(store):
+    return GestureMatcher(
+        store, MATCH_THRESHOLD, MATCHER_METRIC, MATCHER_PARITY, MATCHER_TOP_WORDS, MATCHER_INDEX, MATCHER_INDEX_RADIUS_SCALE
+    )
+
+# Carry a connection over to a reloaded gesture set between frames; live
+# hypotheses survive only for gestures the new set still has
+def sync_gesture_version(state, registry):
+    if state.gesture_version != registry.version:
+        state.hypotheses.remap(registry.matcher)
+        state.gesture_version = registry.version
+
+# Heavy components are built once per process at startup, not at import, so
+# --reload and extra workers don't pay for them twice
+def init_sentence_service():
+    global client, sentence_service
+    client = genai.Client(api_key=load_environment_variables()) if NLP_BACKEND == "gemini" else None
+    sentence_service = SentenceService(
+        GeminiBackend(client) if NLP_BACKEND == "gemini" else StubBackend(NLP_STUB_DELAY),
+        NLP_CACHE_SIZE, NLP_CACHE_TTL, NLP_MAX_CONCURRENCY,
+    )
+
+def init_executor():
+    global executor
+    executor = InferenceExecutor(INFERENCE_WORKERS, INFERENCE_QUEUE_DEPTH, INFERENCE_MODE)
+
+def init_tracker_pool():
+    global tracker_pool
+    tracker_pool = TrackerPool(TRACKER_POOL_SIZE, TRACKER_WARM_SPARES, HANDS_MAX_NUM)
+
+def init_gesture_registry():
+    global gesture_registry
+    gesture_registry = GestureRegistry("gestures.json", build_matcher, GESTURE_RELOAD_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app):
+    await startup.run({
+        "sentence_service": init_sentence_service,
+        "executor": init_executor,
+        "tracker_pool": init_tracker_pool,
+        "gesture_registry": init_gesture_registry,
+    })
+    logger.info("🚀 Ready in %.0f ms: %s", startup.total * 1000, ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in startup.phases.items()))
+    background = []
+    if GESTURE_RELOAD_INTERVAL > 0:
+        background.append(asyncio.create_task(gesture_registry.watch()))
+    yield
+    startup.ready = False
+    for task in background:
+        task.cancel()
+    executor.shutdown()
 
 # Instantiation of app and global variables
-app = FastAPI()
-client = genai.Client(api_key=load_environment_variables())
-user_states = {}
+app = FastAPI(lifespan=lifespan)
+startup = Startup()
+client = None
+sentence_service = None
+executor = None
+tracker_pool = None
+gesture_registry = None
+NLP_BACKEND = os.getenv("NLP_BACKEND", "gemini")  # "gemini", or "stub" for a deterministic local backend
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # DEBUG also logs every frame and stage match
+logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("gestura")
+logger.setLevel(LOG_LEVEL)  # Only ours; libraries stay at their WARNING default
+metrics = Metrics()
 
 # Configuration constants
 COOLDOWN_TIME = 0.5  # Time (in seconds) to wait between detections
 STAGE_TIMEOUT = 5  # Timeout for each stage of gesture matching
-frame_sequence = ["start", "mid1", "mid2", "end"]  # 4-frame stages
+MATCH_THRESHOLD = 0.9  # Maximum DTW distance for a keyframe to count as matched
+MATCHER_METRIC = os.getenv("MATCHER_METRIC", "dtw")  # "dtw" or "lockstep"
+MATCHER_PARITY = os.getenv("MATCHER_PARITY", "0") == "1"  # Cross-check decisions against fastdtw
+MATCHER_TOP_WORDS = int(os.getenv("MATCHER_TOP_WORDS", "16"))  # Words searched variant-by-variant after the centroid pass, 0 scans all
+MATCHER_INDEX = os.getenv("MATCHER_INDEX", "0") == "1"  # KD-tree radius search over start frames, for large vocabularies
+MATCHER_INDEX_RADIUS_SCALE = float(os.getenv("MATCHER_INDEX_RADIUS_SCALE", "1.0"))  # KD-tree radius as a multiple of MATCH_THRESHOLD
+frame_sequence = FRAME_SEQUENCE  # 4-frame stages
 keypoints_to_check =  [0, 1, 4, 5, 8, 9, 12, 13, 16, 17, 20]  # Key landmarks to track
-hands = initialize_mediapipe()
-gesture_dict = load_gesture_data("gestures.json")
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "thread")  # "thread" or "process" pool
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", os.cpu_count() or 2))  # Concurrent hands.process calls
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "4"))  # Frames allowed to wait for a worker
+TRACKER_POOL_SIZE = int(os.getenv("TRACKER_POOL_SIZE", "8"))  # Max Hands graphs leased to connections
+TRACKER_WARM_SPARES = int(os.getenv("TRACKER_WARM_SPARES", "2"))  # Graphs built at startup
+HANDS_MAX_NUM = int(os.getenv("HANDS_MAX_NUM", "1"))  # Hands per tracker; tracking only kicks in once all are found
+INGEST_TARGET_LATENCY = float(os.getenv("INGEST_TARGET_LATENCY", "0.1"))  # Seconds per processed frame before skipping more
+INGEST_INITIAL_SKIP = int(os.getenv("INGEST_INITIAL_SKIP", "3"))  # Process every Nth received frame at connect
+INGEST_MAX_SKIP = int(os.getenv("INGEST_MAX_SKIP", "8"))  # Upper bound for the adaptive skip ratio
+MOTION_GATE = os.getenv("MOTION_GATE", "1") == "1"  # Skip hand inference on frames where nothing moved
+MOTION_PIXEL_THRESHOLD = int(os.getenv("MOTION_PIXEL_THRESHOLD", "12"))  # Grey-level change per thumbnail pixel
+MOTION_MIN_CHANGED = float(os.getenv("MOTION_MIN_CHANGED", "0.005"))  # Fraction of changed pixels that counts as motion
+MOTION_REFRESH_INTERVAL = float(os.getenv("MOTION_REFRESH_INTERVAL", "1.0"))  # Seconds before a static scene is re-inferred
+DECODE_TARGET = (
+    int(os.getenv("DECODE_TARGET_WIDTH", "320")), int(os.getenv("DECODE_TARGET_HEIGHT", "240"))
+)  # Smallest decoded frame size for inference; 0x0 decodes at full resolution
+HAND_ROI = os.getenv("HAND_ROI", "0") == "1"  # Crop inference to the region around the last detected hand
+HAND_ROI_MARGIN = float(os.getenv("HAND_ROI_MARGIN", "0.3"))  # Padding per side as a fraction of the hand box
+HAND_ROI_FULL_EVERY = int(os.getenv("HAND_ROI_FULL_EVERY", "30"))  # Full-frame pass interval so new hands are found
+GESTURE_RELOAD_INTERVAL = float(os.getenv("GESTURE_RELOAD_INTERVAL", "1.0"))  # Seconds between gestures.json checks, 0 disables
+TRANSCRIPT_WINDOW = int(os.getenv("TRANSCRIPT_WINDOW", "200"))  # Words kept per connection for snapshots
+DEBUG_TAP = os.getenv("DEBUG_TAP", "0") == "1"  # Keep sampled decoded frames in memory for /debug/frames
+DEBUG_TAP_EVERY = int(os.getenv("DEBUG_TAP_EVERY", "30"))  # Sample every Nth decoded frame per connection
+DEBUG_TAP_CAPACITY = int(os.getenv("DEBUG_TAP_CAPACITY", "32"))  # Samples kept across all connections
+DEBUG_TAP_DIR = os.getenv("DEBUG_TAP_DIR", "debug_frames")  # Where /debug/flush writes the samples
+debug_tap = DebugTap(DEBUG_TAP, DEBUG_TAP_EVERY, DEBUG_TAP_CAPACITY)
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", "2"))  # Seconds without a message before a connection is closed
+RECORD_DIR = os.getenv("RECORD_DIR", "")  # Record each session's landmarks here for bench.py; empty disables
+RECORD_JPEG = os.getenv("RECORD_JPEG", "0") == "1"  # Also keep the received JPEG frames in the recording
+
+# Per-connection frame counters, as exported on /metrics
+def connection_counters(state):
+    return {**state.ingest.counters, "detection": state.detection_frames, "tracking": state.tracking_frames}
+
+# Give back what a session leased; runs once however the session ended
+def release_session(state):
+    metrics.close_connection(connection_counters(state))
+    if state.tracker is not None:
+        tracker_pool.release(state.tracker)
+        state.tracker = None
+    if state.recorder is not None:
+        state.recorder.close()
+        logger.info("Recorded %d frames to %s", state.recorder.frames, state.recorder.path)
+    logger.info("detection frames %d, tracking frames %d for %s", state.detection_frames, state.tracking_frames, state.key)
+
+sessions = SessionManager(SESSION_IDLE_TIMEOUT, release_session)
+NLP_CACHE_SIZE = int(os.getenv("NLP_CACHE_SIZE", "256"))  # Word lists whose sentence is kept
+NLP_CACHE_TTL = float(os.getenv("NLP_CACHE_TTL", "600"))  # Seconds a cached sentence stays valid
+NLP_MAX_CONCURRENCY = int(os.getenv("NLP_MAX_CONCURRENCY", "4"))  # Backend calls allowed at once
+NLP_STUB_DELAY = float(os.getenv("NLP_STUB_DELAY", "0"))  # Simulated latency of the stub backend
+
+# Receive raw frames into the connection's ingest slot until the socket fails;
+# text messages are client control requests and are answered right away
+async def receive_frames(websocket, ingest, state):
+    try:
+        while True:
+            message = await asyncio.wait_for(websocket.receive(), timeout=SESSION_IDLE_TIMEOUT)
+            state.last_active = time.time()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes") is not None:
+                ingest.put(message["bytes"])
+            elif message.get("text") is not None:
+                await handle_client_message(message["text"], state, websocket)
+    except Exception as e:
+        ingest.close(e)
 
 # WebSocket endpoint
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
 
-    user_states[websocket] = {
-        "pending_gesture": None,
-        "frame_stage": 0,
-        "stage_start_time": None,
-        "last_detection_time": 0,
-        "fc": 0,
-        "detected_words": []
-    }
-    print("WebSocket connection established")
+    user_state = sessions.open(Session(
+        websocket,
+        StageTracker(len(FRAME_SEQUENCE) - 1),
+        FrameIngest(INGEST_TARGET_LATENCY, INGEST_INITIAL_SKIP, INGEST_MAX_SKIP),
+        Transcript(TRANSCRIPT_WINDOW),
+        websocket.query_params.get("transcript", "list"),
+        MotionGate(MOTION_PIXEL_THRESHOLD, MOTION_MIN_CHANGED, MOTION_REFRESH_INTERVAL) if MOTION_GATE else None,
+        HandROI(HAND_ROI_MARGIN, full_every=HAND_ROI_FULL_EVERY) if HAND_ROI else None,
+        gesture_registry.version,
+        websocket.query_params.get("ack") == "1",
+    ))
+    if RECORD_DIR:
+        os.makedirs(RECORD_DIR, exist_ok=True)
+        user_state.recorder = SessionWriter(
+            os.path.join(RECORD_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{user_state.key.replace(':', '_').replace('#', '_')}.gsr")
+        )
+    logger.info("WebSocket connection established for %s", user_state.key)
 
+    receiver = None
     try:
+        # Process pools can't share a leased graph, they fall back to per-worker ones
+        if executor.mode == "thread":
+            user_state.tracker = await tracker_pool.acquire()
+        # Receive on a separate task so only the newest payload is ever decoded
+        ingest = user_state.ingest
+        if user_state.transcript_mode == "delta":
+            await websocket.send_text(json.dumps(user_state.transcript.snapshot()))
+        receiver = asyncio.create_task(receive_frames(websocket, ingest, user_state))
+        decode_timing = {}  # Reused for every frame of this connection
         while True:
-            data = await asyncio.wait_for(websocket.receive_bytes(), timeout=2.0)
-            user_state = user_states[websocket]
-            user_state["fc"] += 1
-            np_arr = np.frombuffer(data, np.uint8)
-            img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-            if img is not None and user_state["fc"] % 3 == 0:
-                # and user_state["fc"] % 3 == 0
-                print(f"processing frame {user_state['fc']} for {websocket.client}")
+            data = await ingest.next_payload()
+            sync_gesture_version(user_state, gesture_registry)
+            matcher = gesture_registry.matcher
+            # Client-side landmarks go straight to the matcher; JPEG frames are the fallback
+            if is_landmark_packet(data):
+                started = time.perf_counter()
+                try:
+                    await process_landmark_packet(
+                        data, user_state, matcher, frame_sequence, keypoints_to_check, COOLDOWN_TIME, STAGE_TIMEOUT, websocket
+                    )
+                except ValueError as e:
+                    metrics.inc("bad_packets")
+                    logger.warning("Bad landmark packet from %s: %s", websocket.client, e)
+                    continue
+                elapsed = time.perf_counter() - started
+                ingest.record(elapsed)
+                metrics.observe("frame", elapsed)
+                await send_ack(websocket, user_state)
+                continue
+            if RECORD_JPEG and user_state.recorder is not None:
+                user_state.recorder.write_jpeg(data, time.time())
+            # Decoded straight to RGB, reduced towards DECODE_TARGET when the JPEG is larger
+            frame_started = time.perf_counter()
+            img = decode_frame(data, DECODE_TARGET, rgb=True, timing=decode_timing)
+            if img is not None:
+                metrics.observe("decode", decode_timing["decode"])
+                metrics.observe("color", decode_timing["color"])
+                ingest.counters["decoded"] += 1
+                debug_tap.capture(user_state.key, ingest.counters["decoded"], img, rgb=True)
+                logger.debug("processing frame %d for %s", ingest.current, user_state.key)
+                started = time.perf_counter()
                 await process_frame(
-                    img, user_state, hands, gesture_dict, frame_sequence, keypoints_to_check, COOLDOWN_TIME, STAGE_TIMEOUT, websocket
+                    img, user_state, executor, matcher, frame_sequence, keypoints_to_check, COOLDOWN_TIME, STAGE_TIMEOUT, websocket
                 )
+                finished = time.perf_counter()
+                ingest.record(finished - started)
+                metrics.observe("frame", finished - frame_started)  # Decode included
+            else:
+                metrics.inc("decode_failures")
+            await send_ack(websocket, user_state)
     except Exception as e:
-        print(f"WebSocket connection error: {e}")
+        if isinstance(e, asyncio.TimeoutError):
+            sessions.stats["timed_out"] += 1
+        logger.info("WebSocket connection error for %s: %r", user_state.key, e)
     finally:
-        await websocket.close()
-        print("WebSocket connection closed.")
+        if receiver is not None:
+            receiver.cancel()
+        sessions.close(user_state)
+        try:
+            await websocket.close()
+        except (RuntimeError, WebSocketDisconnect):
+            pass  # Already closed by the client
+        logger.info("WebSocket connection closed for %s", user_state.key)
 
-@app.post("/nlp_process")
-def nlp_processed_text(request: NLPRequest):
-    prompt = "This is an API call. Generate a meaningful sentence from these words in beginning. If some sign is named as sign-name_some-number then you can ignore everything after the underscore. Only respond with the sentence and nothign else. So something like return_5 is just return etc. Try to make the sentence sound casua\ as well. The words start now: "+" ".join(request.words)
-    print(prompt)
-    response = client.models.generate_content(
-    model="gemini-2.0-flash",
-    contents=[prompt]
+@app.get("/inference_stats")
+def inference_stats():
+    return executor.report()
+
+@app.get("/tracker_stats")
+def tracker_stats():
+    connections = {
+        state.key: {
+            "leased_tracker": state.tracker is not None,
+            "detection_frames": state.detection_frames,
+            "tracking_frames": state.tracking_frames,
+            "roi": state.roi.report() if state.roi is not None else None,
+        }
+        for state in sessions.sessions.values()
+    }
+    return {"pool": tracker_pool.report(), "connections": connections}
+
+@app.get("/ingest_stats")
+def ingest_stats():
+    return {
+        state.key: state.ingest.report()
+        for state in sessions.sessions.values()
+    }
+
+@app.get("/motion_stats")
+def motion_stats():
+    return {
+        state.key: state.motion_gate.report()
+        for state in sessions.sessions.values()
+        if state.motion_gate is not None
+    }
+
+@app.get("/sessions")
+def session_stats():
+    return sessions.report()
+
+@app.get("/debug/frames")
+def debug_frames():
+    return {**debug_tap.report(), "frames": debug_tap.list()}
+
+@app.get("/debug/frames/{sample_id}")
+def debug_frame(sample_id: int):
+    jpeg = debug_tap.encode(sample_id)
+    if jpeg is None:
+        raise HTTPException(status_code=404, detail="Sample not buffered")
+    return Response(content=jpeg, media_type="image/jpeg")
+
+@app.post("/debug/flush")
+async def debug_flush():
+    written = await debug_tap.flush(DEBUG_TAP_DIR)
+    return {"written": written, "directory": DEBUG_TAP_DIR}
+
+@app.get("/gestures")
+def gestures_info():
+    return gesture_registry.report()
+
+@app.get("/metrics")
+def prometheus_metrics():
+    text = metrics.render(
+        {state.key: connection_counters(state) for state in sessions.sessions.values()},
+        (
+            ("inference_dropped", "Frames dropped because the inference queue was full", executor.stats["dropped"] if executor is not None else 0),
+            ("sessions_opened", "Websocket sessions opened", sessions.stats["opened"]),
+            ("sessions_timed_out", "Websocket sessions closed for being idle", sessions.stats["timed_out"]),
+        ),
+        (
+            ("ready", "1 once start-up has finished", int(startup.ready)),
+            ("sessions", "Live websocket sessions", len(sessions)),
+            ("inference_pending", "Frames in the inference pool, running or queued", executor.pending if executor is not None else 0),
+            ("trackers_leased", "Hands graphs leased to connections", tracker_pool.leased if tracker_pool is not None else 0),
+        ),
     )
-    generated_sentence = response.text
-    print(generated_sentence)
+    return Response(text, media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+def readiness():
+    report = startup.report()
+    return report if startup.ready else JSONResponse(report, status_code=503)
+
+@app.post("/nlp_process")
+async def nlp_processed_text(request: NLPRequest):
+    try:
+        generated_sentence = await sentence_service.generate(request.words)
+    except Exception as e:
+        logger.warning("Sentence generation failed for %s: %r", request.words, e)
+        raise HTTPException(status_code=502, detail="Sentence generation failed")
+    logger.debug("Generated sentence: %s", generated_sentence)
     return {"sentence": generated_sentence}
 
+@app.get("/nlp_stats")
+def nlp_stats():
+    return sentence_service.report()
+
 # Main application
 if __name__ == "__main__":
-    GEMINI_API_KEY = load_environment_variables()
-    hands = initialize_mediapipe()
-    gesture_dict = load_gesture_data("gestures.json")
     uvicorn.run(app, host="0.0.0.0", port=8000)
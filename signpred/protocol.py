@@ -0,0 +1,64 @@
+# Binary landmark packets for the /ws endpoint
+#
+# Clients that run hand tracking locally send these instead of JPEG frames:
+#
+#   offset  size  field
+#   0       2     magic b"GL"
+#   2       1     version (1)
+#   3       1     encoding: 0 = float32, 1 = int16 quantized (value * 2**14)
+#   4       1     hand count
+#   5       3     padding
+#   8       8     float64 client timestamp in seconds
+#   16      ...   hand count x 21 x 3 little-endian values (x, y, z per landmark)
+#
+# One float32 hand is 268 bytes, an int16 hand 142 bytes. Anything without
+# the magic is treated as a JPEG frame.
+import struct
+import numpy as np
+
+MAGIC = b"GL"
+VERSION = 1
+ENCODING_FLOAT32 = 0
+ENCODING_INT16 = 1
+INT16_SCALE = 2 ** 14
+HEADER = struct.Struct("<2sBBBxxxd")
+LANDMARK_SHAPE = (21, 3)
+ENCODING_DTYPES = {ENCODING_FLOAT32: np.dtype("<f4"), ENCODING_INT16: np.dtype("<i2")}
+
+
+def is_landmark_packet(data):
+    return data[:2] == MAGIC
+
+
+# Returns (list of (21, 3) float32 arrays, timestamp); raises ValueError if malformed
+def parse_landmark_packet(data):
+    if len(data) < HEADER.size:
+        raise ValueError("Landmark packet shorter than its header.")
+    magic, version, encoding, hand_count, timestamp = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a landmark packet.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported landmark packet version {version}.")
+    dtype = ENCODING_DTYPES.get(encoding)
+    if dtype is None:
+        raise ValueError(f"Unknown landmark encoding {encoding}.")
+    count = hand_count * LANDMARK_SHAPE[0] * LANDMARK_SHAPE[1]
+    if len(data) != HEADER.size + count * dtype.itemsize:
+        raise ValueError("Landmark packet length does not match its hand count.")
+    values = np.frombuffer(data, dtype=dtype, count=count, offset=HEADER.size)
+    if encoding == ENCODING_INT16:
+        values = values.astype(np.float32) / INT16_SCALE
+    else:
+        values = values.astype(np.float32)
+    hands = values.reshape(hand_count, *LANDMARK_SHAPE)
+    return list(hands), timestamp
+
+
+# Build a packet from a list of (21, 3) landmark arrays
+def encode_landmark_packet(hands, timestamp, quantize=False):
+    encoding = ENCODING_INT16 if quantize else ENCODING_FLOAT32
+    values = np.asarray(hands, dtype=np.float32).reshape(-1, *LANDMARK_SHAPE)
+    if quantize:
+        values = np.clip(np.round(values * INT16_SCALE), -32768, 32767)
+    header = HEADER.pack(MAGIC, VERSION, encoding, len(values), timestamp)
+    return header + values.astype(ENCODING_DTYPES[encoding]).tobytes()
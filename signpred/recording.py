@@ -0,0 +1,87 @@
+# Recorded landmark sessions for offline replay
+#
+#   offset  size  field
+#   0       4     magic b"GSES"
+#   4       1     version (1)
+#   5       3     padding
+#   then records of
+#   0       1     kind: 0 = landmarks, 1 = source JPEG
+#   1       3     padding
+#   4       4     uint32 payload length
+#   8       ...   payload
+#
+# A landmarks payload is a landmark packet (see protocol.py) stamped with the
+# frame's capture time, so an empty frame is a 16-byte packet with no hands.
+# A JPEG payload is a float64 timestamp followed by the frame as received.
+import struct
+from protocol import encode_landmark_packet, parse_landmark_packet
+
+MAGIC = b"GSES"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sBxxx")
+RECORD_HEADER = struct.Struct("<BxxxI")
+JPEG_TIMESTAMP = struct.Struct("<d")
+KIND_LANDMARKS = 0
+KIND_JPEG = 1
+
+
+class SessionWriter:
+    def __init__(self, path, quantize=False):
+        self.path = path
+        self.quantize = quantize  # int16 landmarks, about half the size
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self.frames = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, kind, payload):
+        self.file.write(RECORD_HEADER.pack(kind, len(payload)))
+        self.file.write(payload)
+
+    def write_landmarks(self, hands, timestamp):
+        self._write(KIND_LANDMARKS, encode_landmark_packet(hands, timestamp, self.quantize))
+        self.frames += 1
+
+    def write_jpeg(self, data, timestamp):
+        self._write(KIND_JPEG, JPEG_TIMESTAMP.pack(timestamp) + bytes(data))
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+# Yield (kind, timestamp, payload) per record: a list of (21, 3) arrays for
+# landmarks, raw bytes for JPEGs. Raises ValueError on a malformed file.
+def read_session(path):
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size:
+            raise ValueError(f"{path} is too short to be a session recording.")
+        magic, version = FILE_HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a session recording.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported session recording version {version}.")
+        while True:
+            record = f.read(RECORD_HEADER.size)
+            if not record:
+                return
+            if len(record) < RECORD_HEADER.size:
+                raise ValueError(f"{path} ends inside a record header.")
+            kind, length = RECORD_HEADER.unpack(record)
+            payload = f.read(length)
+            if len(payload) < length:
+                raise ValueError(f"{path} ends inside a record.")
+            if kind == KIND_LANDMARKS:
+                hands, timestamp = parse_landmark_packet(payload)
+                yield kind, timestamp, hands
+            elif kind == KIND_JPEG:
+                (timestamp,) = JPEG_TIMESTAMP.unpack_from(payload)
+                yield kind, timestamp, payload[JPEG_TIMESTAMP.size:]
+            else:
+                raise ValueError(f"Unknown record kind {kind} in {path}.")
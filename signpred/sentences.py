@@ -0,0 +1,105 @@
+# Sentence generation from recognised words, cached and coalesced
+#
+# Word lists are normalised (variant suffixes dropped, lower-cased) so that
+# "Good", "good_2" and "good" share one cache entry. Identical requests that
+# arrive while a backend call is running wait on that call instead of making
+# their own, and at most max_concurrency calls reach the backend at once.
+import asyncio
+import time
+from collections import OrderedDict, deque
+import numpy as np
+
+PROMPT = "This is an API call. Generate a meaningful sentence from these words in beginning. If some sign is named as sign-name_some-number then you can ignore everything after the underscore. Only respond with the sentence and nothign else. So something like return_5 is just return etc. Try to make the sentence sound casua\\ as well. The words start now: "
+
+
+def normalize_words(words):
+    return tuple(word.split('_')[0].strip().lower() for word in words if word.strip())
+
+
+class GeminiBackend:
+    def __init__(self, client, model="gemini-2.0-flash"):
+        self.client = client
+        self.model = model
+
+    async def generate(self, words):
+        response = await self.client.aio.models.generate_content(
+            model=self.model, contents=[PROMPT + " ".join(words)]
+        )
+        return response.text
+
+
+# Deterministic stand-in for the LLM in tests and benchmarks
+class StubBackend:
+    def __init__(self, delay=0.0):
+        self.delay = delay  # Simulated backend latency in seconds
+
+    async def generate(self, words):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return " ".join(words).capitalize() + "."
+
+
+class SentenceService:
+    def __init__(self, backend, cache_size=256, ttl=600.0, max_concurrency=4, latency_window=1000):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.ttl = ttl  # Seconds a generated sentence stays valid
+        self.cache = OrderedDict()  # words -> (expires_at, sentence), oldest first
+        self.inflight = {}  # words -> task of the backend call
+        self.limit = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.latencies = deque(maxlen=latency_window)  # Recent backend call durations
+        self.stats = {"requests": 0, "hits": 0, "coalesced": 0, "backend_calls": 0, "errors": 0}
+
+    async def generate(self, words):
+        key = normalize_words(words)
+        self.stats["requests"] += 1
+        if not key:
+            return ""
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached[1]
+        task = self.inflight.get(key)
+        if task is None:
+            task = self.inflight[key] = asyncio.ensure_future(self._call(key))
+        else:
+            self.stats["coalesced"] += 1
+        # Shielded so one caller disconnecting doesn't cancel the call for everyone waiting
+        return await asyncio.shield(task)
+
+    async def _call(self, key):
+        try:
+            async with self.limit:
+                self.stats["backend_calls"] += 1
+                started = time.perf_counter()
+                try:
+                    sentence = await self.backend.generate(list(key))
+                except Exception:
+                    self.stats["errors"] += 1
+                    raise
+                self.latencies.append(time.perf_counter() - started)
+            self.cache[key] = (time.monotonic() + self.ttl, sentence)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return sentence
+        finally:
+            del self.inflight[key]
+
+    def report(self):
+        requests = self.stats["requests"]
+        latencies = np.array(self.latencies) * 1000
+        percentiles = (
+            dict(zip(("p50_ms", "p90_ms", "p99_ms"), np.percentile(latencies, [50, 90, 99]).tolist()))
+            if len(latencies) else {"p50_ms": None, "p90_ms": None, "p99_ms": None}
+        )
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / requests if requests else 0.0,
+            "cached": len(self.cache),
+            "inflight": len(self.inflight),
+            "max_concurrency": self.max_concurrency,
+            "backend_latency": percentiles,
+        }
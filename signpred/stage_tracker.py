@@ -0,0 +1,71 @@
+# Multi-hypothesis keyframe tracker
+#
+# Every gesture whose "start" frame matches becomes a hypothesis. All live
+# hypotheses are scored against each new frame in one batch, advance
+# independently, and expire on their own stage timeout. When one or more reach
+# the final stage on the same frame, the lowest cumulative distance wins.
+import numpy as np
+
+
+class StageTracker:
+    def __init__(self, final_stage=3):
+        self.final_stage = final_stage
+        self.clear()
+
+    def __len__(self):
+        return len(self.names)
+
+    def clear(self):
+        self.names = []
+        self.indices = np.empty(0, dtype=np.intp)  # Template index in the current matcher
+        self.stages = np.empty(0, dtype=np.intp)  # Next stage each hypothesis needs
+        self.scores = np.empty(0, dtype=np.float64)  # Summed distance of matched stages
+        self.started = np.empty(0, dtype=np.float64)  # When the current stage began
+
+    def _keep(self, mask):
+        self.names = [name for name, keep in zip(self.names, mask) if keep]
+        self.indices = self.indices[mask]
+        self.stages = self.stages[mask]
+        self.scores = self.scores[mask]
+        self.started = self.started[mask]
+
+    # Drop hypotheses that have waited too long for their next stage
+    def expire(self, now, timeout):
+        if len(self.names):
+            self._keep(now - self.started <= timeout)
+
+    # Re-point hypotheses at a reloaded matcher, dropping gestures it no longer has
+    def remap(self, matcher):
+        if len(self.names):
+            self._keep(np.array([name in matcher.index for name in self.names], dtype=bool))
+            self.indices = np.array([matcher.index[name] for name in self.names], dtype=np.intp)
+
+    # Advance live hypotheses with this frame, then admit new "start" matches.
+    # Returns (started names, advanced names, completed (name, score) or None).
+    def step(self, matcher, points, now):
+        advanced = []
+        if len(self.names):
+            distances = matcher.pair_distances(self.stages, self.indices, points)
+            hit = distances < matcher.threshold
+            self.scores[hit] += distances[hit]
+            self.stages[hit] += 1
+            self.started[hit] = now
+            advanced = [name for name, h in zip(self.names, hit) if h]
+            done = np.flatnonzero(hit & (self.stages >= self.final_stage))
+            if len(done):
+                best = done[np.argmin(self.scores[done])]
+                completed = (self.names[best], float(self.scores[best]))
+                self.clear()
+                return [], advanced, completed
+
+        distances = matcher.scores(points, 0)
+        active = set(self.indices.tolist())
+        new = [i for i in np.flatnonzero(distances < matcher.threshold) if i not in active]
+        if new:
+            new = np.array(new, dtype=np.intp)
+            self.names += [matcher.names[i] for i in new]
+            self.indices = np.concatenate((self.indices, new))
+            self.stages = np.concatenate((self.stages, np.ones(len(new), dtype=np.intp)))
+            self.scores = np.concatenate((self.scores, distances[new].astype(np.float64)))
+            self.started = np.concatenate((self.started, np.full(len(new), now)))
+        return [matcher.names[i] for i in new], advanced, None
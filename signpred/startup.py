@@ -0,0 +1,37 @@
+# Timed, parallel application start-up
+import asyncio
+import time
+
+
+class Startup:
+    def __init__(self):
+        self.ready = False
+        self.phases = {}  # name -> seconds the initialiser took
+        self.total = None  # Wall-clock seconds for all phases together
+        self.error = None
+
+    # Run independent synchronous initialisers side by side on worker threads
+    async def run(self, phases):
+        started = time.perf_counter()
+
+        async def timed(name, init):
+            phase_started = time.perf_counter()
+            await asyncio.to_thread(init)
+            self.phases[name] = time.perf_counter() - phase_started
+
+        try:
+            await asyncio.gather(*(timed(name, init) for name, init in phases.items()))
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.total = time.perf_counter() - started
+        self.ready = True
+
+    def report(self):
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "total_ms": 1000 * self.total if self.total is not None else None,
+            "phases_ms": {name: 1000 * seconds for name, seconds in self.phases.items()},
+        }